@@ -25,6 +25,13 @@ DATABASES = {
 
 env.escape_proxy = True
 
+# Cache configuration
+# Defaults to a per-process memory cache, point CACHE_URL at a shared cache
+# (e.g. redis://...) when running several workers
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+}
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.0/howto/deployment/checklist/
 
@@ -72,7 +79,7 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.authentication.ClaimsJWTAuthentication",
     ],
     "EXCEPTION_HANDLER": "core.exceptions.custom_exception_handler",
 }
@@ -116,6 +123,9 @@ WSGI_APPLICATION = "api.wsgi.application"
 
 AUTH_USER_MODEL = "users.User"
 
+# EmailBackend adds the async path of the async login view to ModelBackend
+AUTHENTICATION_BACKENDS = ["users.backends.EmailBackend"]
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -160,6 +170,33 @@ MEDIA_URL = "/media/"
 # Path where media is stored
 MEDIA_ROOT = os.path.join(BASE_DIR, "media/")
 
+# Number of worker processes generating listing image variants
+LISTING_IMAGE_WORKERS = env.int("LISTING_IMAGE_WORKERS", default=2)
+
+# Seconds the staff and superuser flags of a token's user are cached for
+AUTH_USER_CACHE_TTL = env.int("AUTH_USER_CACHE_TTL", default=60)
+
+# Threads verifying passwords for the async login view
+LOGIN_HASH_WORKERS = env.int("LOGIN_HASH_WORKERS", default=os.cpu_count())
+
+# Seconds a cart item holds its units of stock
+STOCK_RESERVATION_TTL = env.int("STOCK_RESERVATION_TTL", default=15 * 60)
+
+# Seconds the response to an Idempotency-Key request is kept for replays
+IDEMPOTENCY_KEY_TTL = env.int("IDEMPOTENCY_KEY_TTL", default=24 * 60 * 60)
+
+# Where the dispatch_outbox command delivers order events, see core.outbox.
+# Sinks are told apart by their "name", the class path by default
+OUTBOX_SINKS = [
+    {"class": "core.outbox.LogSink"},
+]
+# Failed deliveries of an event before it is dead-lettered
+OUTBOX_MAX_ATTEMPTS = env.int("OUTBOX_MAX_ATTEMPTS", default=10)
+# Days delivered events are kept for
+OUTBOX_RETENTION_DAYS = env.int("OUTBOX_RETENTION_DAYS", default=7)
+# Days dead-lettered events are kept for
+OUTBOX_DEAD_RETENTION_DAYS = env.int("OUTBOX_DEAD_RETENTION_DAYS", default=30)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
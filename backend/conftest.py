@@ -3,11 +3,14 @@ import os
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 from PIL import Image
 
+from core.authentication import clear_user_flags
 from listings.models import Category, Listing
-from orders.models import Cart
+from orders.models import Cart, Transaction
+from users.models import Settings
 
 os.environ["DJANGO_SETTINGS_MODULE"] = "api.settings"
 
@@ -15,6 +18,14 @@ User = get_user_model()
 
 
 # Fixtures
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Cached data must not leak between tests, the database does not either
+    cache.clear()
+    Settings.objects.clear_default_cache()
+    clear_user_flags()
+
+
 @pytest.fixture()
 def user_fixture(request):
     user = User.objects.create_user(
@@ -87,6 +98,27 @@ def cart_fixture(user_fixture):
 # Helper functions
 
 
+def sell(buyer, listing, quantity, total):
+    # A transaction of listing from its owner to buyer
+    return Transaction.objects.create(
+        buyer=buyer,
+        seller_id=listing.owner_id,
+        listing=listing,
+        quantity=quantity,
+        total=total,
+    )
+
+
+def csv_file(*lines):
+    # Bytes of a CSV file with the given lines, the header first
+    return "".join(f"{line}\n" for line in lines).encode()
+
+
+def get_error_lines(report):
+    # (line, failing columns) of the rows an import report lists
+    return [(error["line"], list(error["errors"])) for error in report["errors"]]
+
+
 def delete_image(image):
     if os.path.isfile(image.path):
         os.remove(image.path)
@@ -1 +1,20 @@
-# Register your models here.
+from django.contrib import admin
+
+from .models import OutboxEvent
+from .outbox import retry
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ["id", "topic", "attempts", "delivered_at", "dead_at", "created"]
+    list_filter = [
+        "topic",
+        ("delivered_at", admin.EmptyFieldListFilter),
+        ("dead_at", admin.EmptyFieldListFilter),
+    ]
+    readonly_fields = ["created", "modified"]
+    actions = ["retry_events"]
+
+    @admin.action(description="Retry the selected dead events")
+    def retry_events(self, request, queryset):
+        self.message_user(request, f"{retry(queryset)} events queued again")
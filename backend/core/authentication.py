@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+# Bounds the memory of the flags cache, the least recently used go first
+MAX_CACHED_USERS = 10000
+
+FLAG_FIELDS = ("is_staff", "is_superuser")
+
+_flags = OrderedDict()
+_lock = threading.Lock()
+
+
+def forget_user(user_id):
+    # Called when a user changes, other processes catch up within the TTL
+    with _lock:
+        _flags.pop(user_id, None)
+
+
+def clear_user_flags():
+    with _lock:
+        _flags.clear()
+
+
+def get_user_flags(user_id):
+    """
+    ``FLAG_FIELDS`` of the user with ``user_id`` from a per process cache
+    kept for ``AUTH_USER_CACHE_TTL`` seconds, or None if there is no such
+    user.
+    """
+    now = time.monotonic()
+    with _lock:
+        cached = _flags.get(user_id)
+        if cached is not None and cached[0] > now:
+            _flags.move_to_end(user_id)
+            return cached[1]
+
+    fields = FLAG_FIELDS
+    if api_settings.CHECK_REVOKE_TOKEN:
+        fields += ("password",)
+    flags = (
+        get_user_model()
+        ._default_manager.filter(**{api_settings.USER_ID_FIELD: user_id})
+        .values(*fields)
+        .first()
+    )
+    if flags is None:
+        return None
+    if "password" in flags:
+        flags["password"] = get_md5_hash_password(flags["password"])
+
+    with _lock:
+        _flags[user_id] = (now + settings.AUTH_USER_CACHE_TTL, flags)
+        _flags.move_to_end(user_id)
+        while len(_flags) > MAX_CACHED_USERS:
+            _flags.popitem(last=False)
+    return flags
+
+
+class ClaimsUser(SimpleLazyObject):
+    """
+    The user of a token, without a query. The id and the cached flags are
+    plain attributes, anything else (another field, comparing it with a
+    model instance, assigning it to a foreign key) loads the full ``User``
+    once.
+    """
+
+    def __init__(self, user_id, flags):
+        user_model = get_user_model()
+        lookup = {api_settings.USER_ID_FIELD: user_id}
+        super().__init__(partial(user_model._default_manager.get, **lookup))
+
+        # Set on the instance so the lookups never reach the wrapped user
+        attributes = {
+            **lookup,
+            "is_staff": flags["is_staff"],
+            "is_superuser": flags["is_superuser"],
+            "is_active": True,
+            "is_authenticated": True,
+            "is_anonymous": False,
+        }
+        if api_settings.USER_ID_FIELD == user_model._meta.pk.attname:
+            attributes["pk"] = user_id
+        self.__dict__.update(attributes)
+
+    def __bool__(self):
+        return True
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` that does not load the user on every request, see
+    ``ClaimsUser``.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from None
+
+        flags = get_user_flags(user_id)
+        if flags is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if (
+                validated_token.get(api_settings.REVOKE_TOKEN_CLAIM)
+                != flags["password"]
+            ):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return ClaimsUser(user_id, flags)
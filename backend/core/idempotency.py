@@ -0,0 +1,133 @@
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+PURGE_BATCH_SIZE = 1000
+
+
+class IdempotencyKeyInUse(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "A request with this Idempotency-Key is still in progress."
+    default_code = "idempotency_key_in_use"
+
+
+class IdempotencyKeyMismatch(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = "This Idempotency-Key was used with a different request."
+    default_code = "idempotency_key_mismatch"
+
+
+def get_fingerprint(request):
+    # Built from the parsed data, the raw body may already be consumed
+    data = request.data
+    if hasattr(data, "lists"):
+        data = dict(data.lists())
+    payload = json.dumps(
+        [request.method, request.path, data], sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _claim(user, key, fingerprint):
+    """
+    Return the locked record of ``key``, either the stored response or a new
+    claim for this request. Runs in the transaction of the view, so a
+    concurrent request with the same key waits for it to commit.
+    """
+    now = timezone.now()
+    records = IdempotencyKey.objects.select_for_update().filter(user=user, key=key)
+    record = records.first()
+    if record is not None and (record.expires_at <= now or record.status_code is None):
+        # Expired, or left without a response by an older version
+        record.delete()
+        record = None
+
+    if record is None:
+        try:
+            with transaction.atomic():
+                return IdempotencyKey.objects.create(
+                    user=user,
+                    key=key,
+                    fingerprint=fingerprint,
+                    expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+                )
+        except IntegrityError:
+            # Claimed by a concurrent request that has committed since
+            record = records.first()
+            if record is None:
+                raise IdempotencyKeyInUse() from None
+
+    if record.fingerprint != fingerprint:
+        raise IdempotencyKeyMismatch()
+    return record
+
+
+def _store(record, response):
+    record.status_code = response.status_code
+    record.response = response.data
+    record.modified = timezone.now()
+    record.save(update_fields=["status_code", "response", "modified"])
+
+
+def idempotent(view_method):
+    """
+    Make a write view safe to retry with an ``Idempotency-Key`` header.
+
+    The first request with a key runs the view and stores its response, a
+    retry with the same key and body gets the stored response back without
+    running the view again. Server errors and errors raised by the view are
+    not stored, so those requests can be retried. Requests without the
+    header are not affected.
+
+    The claim of the key, the view and the stored response share one
+    transaction: either the writes of the view are committed together with
+    its response, or none of them are.
+    """
+
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key or not request.user.is_authenticated:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > IdempotencyKey._meta.get_field("key").max_length:
+            raise ValidationError({HEADER: "Key is too long"})
+
+        with transaction.atomic():
+            record = _claim(request.user, key, get_fingerprint(request))
+            if record.status_code is not None:
+                response = Response(record.response, status=record.status_code)
+                response["Idempotent-Replayed"] = "true"
+                return response
+
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code >= 500:
+                record.delete()
+            else:
+                _store(record, response)
+        return response
+
+    return wrapper
+
+
+def purge_expired(batch_size=PURGE_BATCH_SIZE):
+    # Deletes expired keys batch_size rows at a time, returns the count
+    purged = 0
+    expired = IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).order_by(
+        "expires_at"
+    )
+    while True:
+        ids = list(expired.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return purged
+        purged += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.outbox import DISPATCH_BATCH_SIZE, dispatch, get_sinks, prune
+
+
+class Command(BaseCommand):
+    help = "Deliver pending outbox events to the configured sinks"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DISPATCH_BATCH_SIZE,
+            help="Number of events claimed per batch",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for new events instead of exiting",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait between polls when looping",
+        )
+
+    def handle(self, *args, **options):
+        sinks = get_sinks()
+        while True:
+            dispatched = 0
+            while claimed := dispatch(sinks, batch_size=options["batch_size"]):
+                dispatched += claimed
+            pruned = prune()
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{dispatched} outbox events dispatched, {pruned} pruned"
+                )
+            )
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from core.idempotency import PURGE_BATCH_SIZE, purge_expired
+
+
+class Command(BaseCommand):
+    help = "Delete expired idempotency keys"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=PURGE_BATCH_SIZE,
+            help="Number of keys deleted per batch",
+        )
+
+    def handle(self, *args, **options):
+        purged = purge_expired(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"{purged} expired idempotency keys deleted")
+        )
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.8 on 2026-10-18 15:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0002_outbox_event"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="outboxevent",
+            name="outbox_pending_idx",
+        ),
+        migrations.AddField(
+            model_name="outboxevent",
+            name="dead_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="outboxevent",
+            name="delivered_to",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddIndex(
+            model_name="outboxevent",
+            index=models.Index(
+                condition=models.Q(
+                    ("dead_at__isnull", True), ("delivered_at__isnull", True)
+                ),
+                fields=["available_at", "id"],
+                name="outbox_pending_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="outboxevent",
+            index=models.Index(fields=["dead_at"], name="outbox_dead_idx"),
+        ),
+    ]
@@ -1,4 +1,7 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
 
 # Create your models here.
 
@@ -9,3 +12,62 @@ class BaseModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class IdempotencyKey(BaseModel):
+    # Outcome of a write request sent with an Idempotency-Key header
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    # Empty while the original request is still being processed
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Idempotency key"
+        verbose_name_plural = "Idempotency keys"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "key"], name="idempotency_key_user_key_unique"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["expires_at"], name="idempotency_key_expires_idx")
+        ]
+
+    def __str__(self):
+        return self.key
+
+
+class OutboxEvent(BaseModel):
+    # Event written with the change it describes, delivered by core.outbox
+    topic = models.CharField(max_length=100)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+    # Names of the sinks that have the event, it is delivered once all do
+    delivered_to = models.JSONField(default=list, blank=True)
+    # Set once OUTBOX_MAX_ATTEMPTS deliveries failed, the event is then left
+    # alone until it is retried from the admin or pruned
+    dead_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = "Outbox event"
+        verbose_name_plural = "Outbox events"
+        indexes = [
+            # Pending events, in the order the dispatcher claims them
+            models.Index(
+                fields=["available_at", "id"],
+                condition=models.Q(delivered_at__isnull=True, dead_at__isnull=True),
+                name="outbox_pending_idx",
+            ),
+            # Pruning delivered and dead events
+            models.Index(fields=["delivered_at"], name="outbox_delivered_idx"),
+            models.Index(fields=["dead_at"], name="outbox_dead_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.topic} {self.id}"
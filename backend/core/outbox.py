@@ -0,0 +1,207 @@
+import json
+import logging
+import urllib.request
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+DISPATCH_BATCH_SIZE = 100
+PRUNE_BATCH_SIZE = 1000
+
+# Seconds before the first retry, doubled on every failed attempt
+RETRY_DELAY = 30
+MAX_RETRY_DELAY = 60 * 60
+
+
+def publish(topic, payloads):
+    """
+    Write one ``topic`` event per payload with a single insert. Call it in
+    the transaction of the change so the events exist if and only if the
+    change commits.
+    """
+    return OutboxEvent.objects.bulk_create(
+        [OutboxEvent(topic=topic, payload=payload) for payload in payloads]
+    )
+
+
+def serialize_event(event):
+    return {
+        "id": event.id,
+        "topic": event.topic,
+        "payload": event.payload,
+        "created": event.created,
+    }
+
+
+# Sinks take a list of events and raise to have them retried. A failed
+# batch is sent again whole, so a sink may see an event more than once and
+# should ignore the ids it already has
+class LogSink:
+    def deliver(self, events):
+        for event in events:
+            logger.info("Outbox event %s %s: %s", event.id, event.topic, event.payload)
+
+
+class FileSink:
+    # Appends the events to a JSON lines file, handy for local setups and tests
+    def __init__(self, path):
+        self.path = path
+
+    def deliver(self, events):
+        with open(self.path, "a") as file:
+            for event in events:
+                file.write(json.dumps(serialize_event(event), cls=DjangoJSONEncoder))
+                file.write("\n")
+
+
+class HttpSink:
+    # POSTs the events as a JSON list, any non 2xx answer is a failure
+    def __init__(self, url, timeout=10, headers=None):
+        self.url = url
+        self.timeout = timeout
+        self.headers = headers or {}
+
+    def deliver(self, events):
+        body = json.dumps(
+            [serialize_event(event) for event in events], cls=DjangoJSONEncoder
+        )
+        request = urllib.request.Request(
+            self.url,
+            data=body.encode(),
+            headers={"Content-Type": "application/json", **self.headers},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+def get_sinks():
+    # {name: sink} of OUTBOX_SINKS
+    return {
+        sink.get("name", sink["class"]): import_string(sink["class"])(
+            **sink.get("options", {})
+        )
+        for sink in settings.OUTBOX_SINKS
+    }
+
+
+def get_retry_delay(attempts):
+    return timedelta(seconds=min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY))
+
+
+def _deliver(sinks, events):
+    # Hands every sink the events it does not have, returns their errors
+    errors = {}
+    for name, sink in sinks.items():
+        missing = [event for event in events if name not in event.delivered_to]
+        if not missing:
+            continue
+        try:
+            sink.deliver(missing)
+        except Exception as exc:
+            logger.error(
+                "Outbox delivery of %s events to %s failed: %s",
+                len(missing),
+                name,
+                exc,
+            )
+            for event in missing:
+                errors.setdefault(event.id, []).append(f"{name}: {exc}")
+        else:
+            for event in missing:
+                event.delivered_to = [*event.delivered_to, name]
+    return errors
+
+
+def _schedule_retry(event, errors, now):
+    # Backs off the next attempt, dead-letters the event past the limit
+    event.attempts += 1
+    event.available_at = now + get_retry_delay(event.attempts)
+    event.last_error = "\n".join(errors)
+    if event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        event.dead_at = now
+        logger.error("Outbox event %s dead after %s attempts", event.id, event.attempts)
+
+
+def dispatch(sinks, batch_size=DISPATCH_BATCH_SIZE):
+    """
+    Deliver one batch of pending events to every sink of ``sinks``, a
+    ``{name: sink}`` dict. Returns the number of events claimed, 0 once
+    nothing is left to do.
+
+    Rows are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` where the
+    database supports it, so several dispatchers can run side by side.
+    Delivery is tracked per sink: when a sink fails, only it gets the
+    events again, later with an exponential backoff. Events still missing
+    a sink after ``OUTBOX_MAX_ATTEMPTS`` attempts are dead-lettered.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        pending = OutboxEvent.objects.filter(
+            delivered_at__isnull=True,
+            dead_at__isnull=True,
+            available_at__lte=now,
+        ).order_by("available_at", "id")
+        if connection.features.has_select_for_update_skip_locked:
+            pending = pending.select_for_update(skip_locked=True)
+        events = list(pending[:batch_size])
+        if not events:
+            return 0
+
+        errors = _deliver(sinks, events)
+        for event in events:
+            event.modified = now
+            if event.id in errors:
+                _schedule_retry(event, errors[event.id], now)
+            else:
+                event.delivered_at = now
+        OutboxEvent.objects.bulk_update(
+            events,
+            [
+                "attempts",
+                "available_at",
+                "delivered_at",
+                "delivered_to",
+                "dead_at",
+                "last_error",
+                "modified",
+            ],
+        )
+
+    return len(events)
+
+
+def retry(queryset):
+    # Puts dead events back in the queue, the sinks that had them are skipped
+    return queryset.filter(dead_at__isnull=False).update(
+        dead_at=None, attempts=0, available_at=timezone.now(), modified=timezone.now()
+    )
+
+
+def _delete_batches(queryset, batch_size):
+    deleted = 0
+    while True:
+        ids = list(queryset.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += OutboxEvent.objects.filter(id__in=ids).delete()[0]
+
+
+def prune(batch_size=PRUNE_BATCH_SIZE):
+    # Deletes delivered and dead events past their retention, returns the count
+    now = timezone.now()
+    delivered = OutboxEvent.objects.filter(
+        delivered_at__lt=now - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+    ).order_by("delivered_at")
+    dead = OutboxEvent.objects.filter(
+        dead_at__lt=now - timedelta(days=settings.OUTBOX_DEAD_RETENTION_DAYS)
+    ).order_by("dead_at")
+    return _delete_batches(delivered, batch_size) + _delete_batches(dead, batch_size)
@@ -0,0 +1,116 @@
+import json
+from base64 import b64decode, b64encode
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination over a composite, unique ordering such as
+    ``("-created", "-id")``.
+
+    Unlike DRF's ``CursorPagination`` the cursor stores the values of every
+    ordering field of the boundary row, so a page is always fetched with a
+    single ``WHERE (created, id) < (...)`` range scan on the matching index.
+    No ``COUNT(*)`` and no ``OFFSET`` is ever issued.
+    """
+
+    ordering = ("-created", "-id")
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.fields = [
+            queryset.model._meta.get_field(order.lstrip("-")) for order in self.ordering
+        ]
+
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor["reverse"]
+
+        if reverse:
+            queryset = queryset.order_by(*_flip(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if self.cursor is not None:
+            queryset = queryset.filter(
+                self.get_keyset_filter(self.cursor["position"], reverse)
+            )
+
+        # Fetch one extra row to find out whether there is a following page
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        return self.page
+
+    def get_keyset_filter(self, position, reverse):
+        # Builds the lexicographic comparison
+        # (a < x) OR (a = x AND b < y) OR ...
+        descending = self.ordering[0].startswith("-") != reverse
+        lookup = "lt" if descending else "gt"
+
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.fields, position):
+            condition |= Q(**equal, **{f"{field.attname}__{lookup}": value})
+            equal[field.attname] = value
+        return condition
+
+    def get_position(self, instance):
+        return [getattr(instance, field.attname) for field in self.fields]
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            cursor = json.loads(b64decode(encoded.encode("ascii")).decode("ascii"))
+            position = [
+                field.to_python(value)
+                for field, value in zip(self.fields, cursor["p"], strict=True)
+            ]
+            return {"position": position, "reverse": bool(cursor["r"])}
+        except (TypeError, ValueError, KeyError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message) from None
+
+    def encode_cursor(self, position, reverse):
+        cursor = {"p": [str(value) for value in position], "r": int(reverse)}
+        encoded = b64encode(json.dumps(cursor).encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+
+def _flip(ordering):
+    return tuple(
+        order[1:] if order.startswith("-") else f"-{order}" for order in ordering
+    )
@@ -0,0 +1,44 @@
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def _parse_field_names(value):
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+def get_sparse_fieldset(request, available):
+    """
+    Return the names out of ``available`` selected by the ``fields`` and
+    ``omit`` query parameters, e.g. ``?fields=id,title`` or
+    ``?omit=description``.
+    """
+    kept = set(available)
+    for param in ("fields", "omit"):
+        value = request.query_params.get(param)
+        if not value:
+            continue
+
+        names = _parse_field_names(value)
+        unknown = names - set(available)
+        if unknown:
+            raise serializers.ValidationError(
+                {param: f"Unknown field(s): {', '.join(sorted(unknown))}"}
+            )
+        kept = kept & names if param == "fields" else kept - names
+
+    return kept
+
+
+class SparseFieldsetMixin:
+    # Prunes the serializer fields on reads, see get_sparse_fieldset
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        request = self.context.get("request")
+        if request is None or request.method not in SAFE_METHODS:
+            return
+
+        kept = get_sparse_fieldset(request, self.fields.keys())
+        for name in list(self.fields):
+            if name not in kept:
+                self.fields.pop(name)
@@ -0,0 +1,229 @@
+import codecs
+import csv
+import json
+from abc import ABC, abstractmethod
+from pathlib import PurePath
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import SkipField, empty
+
+FILE_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+# Lines are sent in chunks of about this many characters
+CHUNK_SIZE = 64 * 1024
+
+DEFAULT_BATCH_SIZE = 500
+
+# Keeps import reports bounded for files that are wrong throughout
+MAX_REPORTED_ERRORS = 1000
+
+
+class RecordError(Exception):
+    pass
+
+
+def get_file_format(name):
+    return FILE_FORMATS.get(PurePath(name).suffix.lower())
+
+
+def get_error_messages(detail):
+    # Plain strings of a ValidationError detail, for import reports
+    if isinstance(detail, dict):
+        return {key: get_error_messages(value) for key, value in detail.items()}
+    if isinstance(detail, list):
+        return [str(message) for message in detail]
+    return [str(detail)]
+
+
+def _iter_csv(lines):
+    # line_num is the last line read, where a multi-line row ends
+    reader = csv.DictReader(lines)
+    for record in reader:
+        if None in record:
+            yield reader.line_num, RecordError("Row has more values than columns")
+        else:
+            yield reader.line_num, record
+
+
+def _iter_jsonl(lines):
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_number, RecordError(f"Invalid JSON: {exc}")
+            continue
+        if not isinstance(record, dict):
+            yield line_number, RecordError("Expected a JSON object")
+            continue
+        yield line_number, record
+
+
+class _Lines:
+    # Decoded lines of a binary stream, counted to report where decoding failed
+    def __init__(self, stream):
+        self.lines = codecs.iterdecode(stream, "utf-8-sig")
+        self.count = 0
+
+    def __iter__(self):
+        for line in self.lines:
+            self.count += 1
+            yield line
+
+
+def _stop_at_decode_error(records, lines):
+    # The rest of the file cannot be read, the rows before it still count
+    try:
+        yield from records
+    except UnicodeDecodeError as exc:
+        yield lines.count + 1, RecordError(f"File must be UTF-8 encoded: {exc}")
+
+
+def iter_records(stream, file_format):
+    """
+    Yield ``(line number, record)`` pairs from a binary CSV or JSON lines
+    stream, one line at a time so memory use does not grow with the file.
+
+    Records are dicts; a line that cannot be parsed yields a ``RecordError``
+    instead so the caller can report it and carry on. Bytes that are not
+    UTF-8 yield a last ``RecordError`` and end the records.
+    """
+    lines = _Lines(stream)
+    if file_format == "csv":
+        return _stop_at_decode_error(_iter_csv(lines), lines)
+    if file_format == "jsonl":
+        return _stop_at_decode_error(_iter_jsonl(lines), lines)
+    raise ValueError(f"Unsupported file format: {file_format}")
+
+
+class RecordImporter(ABC):
+    """
+    Base of the CSV and JSON lines importers. Records are checked with
+    ``validate_row`` and the valid ones handed to ``flush`` as
+    ``(line number, attrs)`` pairs, ``batch_size`` at a time. Invalid
+    records are counted and reported with their line number.
+
+    Subclasses set ``fields``, serializer fields by column name, and
+    implement ``flush``, adding what they created to ``created``.
+    """
+
+    fields = {}
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def validate_field(self, name, value):
+        return self.fields[name].run_validation(value)
+
+    def validate_fields(self, record):
+        # Returns the valid values and the errors of the others
+        attrs = {}
+        errors = {}
+        for name in self.fields:
+            value = record.get(name)
+            if value is None or value == "":
+                value = empty
+            try:
+                attrs[name] = self.validate_field(name, value)
+            except SkipField:
+                continue
+            except ValidationError as exc:
+                errors[name] = get_error_messages(exc.detail)
+        return attrs, errors
+
+    def validate_row(self, record):
+        attrs, errors = self.validate_fields(record)
+        if errors:
+            raise ValidationError(errors)
+        return attrs
+
+    def accept(self, line_number, attrs):
+        # Last say on a valid row, e.g. to report duplicates within the file
+        return True
+
+    def add_error(self, line_number, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line_number, "errors": errors})
+
+    @abstractmethod
+    def flush(self, rows):
+        """Write a batch of ``(line number, attrs)`` rows."""
+
+    def run(self, stream, file_format):
+        batch = []
+        for line_number, record in iter_records(stream, file_format):
+            if isinstance(record, RecordError):
+                self.add_error(line_number, {"non_field_errors": [str(record)]})
+                continue
+
+            try:
+                attrs = self.validate_row(record)
+            except ValidationError as exc:
+                self.add_error(line_number, get_error_messages(exc.detail))
+                continue
+            if not self.accept(line_number, attrs):
+                continue
+
+            batch.append((line_number, attrs))
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                batch = []
+
+        if batch:
+            self.flush(batch)
+        return self.get_report()
+
+    def get_report(self):
+        return {"created": self.created, "failed": self.failed, "errors": self.errors}
+
+
+class _Echo:
+    # File-like object for csv.writer that hands back the written line
+    def write(self, value):
+        return value
+
+
+def _chunked(lines, size=CHUNK_SIZE):
+    chunk = []
+    length = 0
+    for line in lines:
+        chunk.append(line)
+        length += len(line)
+        if length >= size:
+            yield "".join(chunk)
+            chunk = []
+            length = 0
+    if chunk:
+        yield "".join(chunk)
+
+
+def _csv_lines(columns, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _jsonl_lines(columns, rows):
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode(dict(zip(columns, row))) + "\n"
+
+
+def iter_lines(columns, rows, file_format):
+    """
+    Encode ``rows`` (tuples ordered like ``columns``) as CSV or JSON lines,
+    yielding text chunks for a ``StreamingHttpResponse``. Rows are consumed
+    lazily, so pass an iterator to keep memory flat.
+    """
+    if file_format == "csv":
+        return _chunked(_csv_lines(columns, rows))
+    if file_format == "jsonl":
+        return _chunked(_jsonl_lines(columns, rows))
+    raise ValueError(f"Unsupported file format: {file_format}")
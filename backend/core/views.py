@@ -0,0 +1,111 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
+def make_etag(*parts):
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+def get_not_modified_response(request, etag, last_modified):
+    # Returns a 304 response when the client's copy is still fresh, else None
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def _timestamp(values):
+    values = [value for value in values if value is not None]
+    return int(max(values).timestamp()) if values else None
+
+
+def _follow(instance, path):
+    # Resolves "stats__modified" style paths, None when a relation is missing
+    for name in path.split("__"):
+        instance = getattr(instance, name, None)
+        if instance is None:
+            return None
+    return instance
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified support for the list and retrieve actions of
+    viewsets over models with the ``BaseModel.modified`` timestamp.
+
+    Retrieve validates against the object's ``modified``. List validates
+    against a ``MAX(modified)`` / ``COUNT(*)`` fingerprint of the filtered
+    queryset, so a 304 is answered without loading or serializing any row.
+    Views whose representation embeds related rows can list their
+    timestamps in ``modified_fields`` as well, e.g. ``"stats__modified"``.
+    """
+
+    modified_fields = ("modified",)
+
+    def get_modified_fields(self):
+        return self.modified_fields
+
+    def has_modified_field(self):
+        model = self.get_queryset().model
+        return any(
+            field.name == self.modified_fields[0]
+            for field in model._meta.concrete_fields
+        )
+
+    def get_etag_context(self, request):
+        return (
+            request.get_full_path(),
+            request.user.pk,
+            request.accepted_renderer.format,
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not self.has_modified_field():
+            return super().list(request, *args, **kwargs)
+
+        modified_fields = self.get_modified_fields()
+        queryset = self.filter_queryset(self.get_queryset())
+        fingerprint = queryset.order_by().aggregate(
+            count=Count("pk"),
+            **{f"max_{i}": Max(field) for i, field in enumerate(modified_fields)},
+        )
+        modified = [fingerprint[f"max_{i}"] for i in range(len(modified_fields))]
+        last_modified = _timestamp(modified)
+        etag = make_etag(
+            *self.get_etag_context(request), *modified, fingerprint["count"]
+        )
+
+        not_modified = get_not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        response = super().list(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.has_modified_field():
+            return super().retrieve(request, *args, **kwargs)
+
+        instance = self.get_object()
+        modified = [_follow(instance, field) for field in self.get_modified_fields()]
+        last_modified = _timestamp(modified)
+        etag = make_etag(*self.get_etag_context(request), instance.pk, *modified)
+
+        not_modified = get_not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        serializer = self.get_serializer(instance)
+        return set_validators(Response(serializer.data), etag, last_modified)
@@ -0,0 +1,151 @@
+import hashlib
+import time
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+from core.views import get_not_modified_response, set_validators
+
+VERSION_KEY = "listings:version"
+STATS_VERSION_KEY = "listings:stats:{}"
+HITS_KEY = "listings:cache:hits"
+MISSES_KEY = "listings:cache:misses"
+RESPONSE_TIMEOUT = 60 * 10
+
+
+def get_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Start from the clock so that a version key lost to eviction can
+        # never come back with a number that older entries were stored under
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def _bump_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def invalidate_listings():
+    """
+    Make every cached listing response stale.
+
+    The version is bumped right away and again once the surrounding
+    transaction commits, so a response rendered from the old rows between
+    the write and the commit is never stored under the new version.
+    """
+    _bump_version()
+    transaction.on_commit(_bump_version)
+
+
+def _bump_stats_versions(listing_ids):
+    version = time.time_ns()
+    cache.set_many(
+        {STATS_VERSION_KEY.format(listing_id): version for listing_id in listing_ids},
+        timeout=RESPONSE_TIMEOUT,
+    )
+
+
+def invalidate_listing_stats(listing_ids):
+    """
+    Make the cached responses showing the stats of ``listing_ids`` stale,
+    and only those. Each listing keeps the time its stats last changed,
+    responses rendered before that are not served anymore.
+    """
+    listing_ids = list(listing_ids)
+    _bump_stats_versions(listing_ids)
+    transaction.on_commit(lambda: _bump_stats_versions(listing_ids))
+
+
+def _stats_listing_ids(data):
+    # Listings whose stats are part of a listing or page of listings
+    items = data.get("results", [data]) if isinstance(data, dict) else []
+    return [item["id"] for item in items if "stats" in item and "id" in item]
+
+
+def _stats_changed(entry):
+    versions = cache.get_many(
+        [STATS_VERSION_KEY.format(listing_id) for listing_id in entry["listings"]]
+    )
+    return any(version > entry["rendered_at"] for version in versions.values())
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def get_cache_stats():
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / total, 4) if total else None,
+    }
+
+
+def get_response_key(request):
+    # Payloads hold absolute URLs, so the scheme and host are part of the key
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    url = f"{request.scheme}://{request.get_host()}{request.path}?{query}"
+    digest = hashlib.md5(
+        f"{request.accepted_renderer.format}:{url}".encode()
+    ).hexdigest()
+    return f"listings:response:{get_version()}:{digest}"
+
+
+def cache_anonymous_response(view_method):
+    """
+    Serve anonymous GETs of a listing view from the cache.
+
+    Entries are keyed by the listings version, see ``invalidate_listings``,
+    and keep the ETag / Last-Modified validators of the original response so
+    conditional requests can still be answered with a 304.
+    """
+
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return view_method(self, request, *args, **kwargs)
+
+        key = get_response_key(request)
+        entry = cache.get(key)
+        if entry is not None and not _stats_changed(entry):
+            _count(HITS_KEY)
+            etag, last_modified = entry["etag"], entry["last_modified"]
+            if etag is None:
+                return Response(entry["data"])
+
+            not_modified = get_not_modified_response(request, etag, last_modified)
+            if not_modified is not None:
+                return not_modified
+            return set_validators(Response(entry["data"]), etag, last_modified)
+
+        _count(MISSES_KEY)
+        rendered_at = time.time_ns()
+        response = view_method(self, request, *args, **kwargs)
+        if response.status_code == 200:
+            entry = {
+                "data": response.data,
+                "etag": response.get("ETag"),
+                "last_modified": parse_http_date_safe(response.get("Last-Modified")),
+                "listings": _stats_listing_ids(response.data),
+                "rendered_at": rendered_at,
+            }
+            cache.set(key, entry, RESPONSE_TIMEOUT)
+        return response
+
+    return wrapper
@@ -0,0 +1,124 @@
+from django.db.models import Count, Q
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend
+
+# (lower bound inclusive, upper bound exclusive), None means unbounded
+PRICE_BUCKETS = [(0, 25), (25, 50), (50, 100), (100, 250), (250, 500), (500, None)]
+
+
+class ListingFilterSerializer(serializers.Serializer):
+    category = serializers.IntegerField(required=False)
+    min_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, required=False
+    )
+    max_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, required=False
+    )
+    active = serializers.BooleanField(required=False, allow_null=True)
+    in_stock = serializers.BooleanField(required=False, allow_null=True)
+    modified_since = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        min_price = attrs.get("min_price")
+        max_price = attrs.get("max_price")
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise serializers.ValidationError("min_price cannot exceed max_price")
+        return attrs
+
+
+class ListingFilterBackend(BaseFilterBackend):
+    def filter_queryset(self, request, queryset, view):
+        serializer = ListingFilterSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = {
+            key: value
+            for key, value in serializer.validated_data.items()
+            if value is not None
+        }
+
+        if "category" in params:
+            queryset = queryset.filter(category_id=params["category"])
+        if "min_price" in params:
+            queryset = queryset.filter(price__gte=params["min_price"])
+        if "max_price" in params:
+            queryset = queryset.filter(price__lte=params["max_price"])
+        if "active" in params:
+            queryset = queryset.filter(active=params["active"])
+        if "in_stock" in params:
+            # Same rule as Listing.is_out_of_stock
+            if params["in_stock"]:
+                queryset = queryset.filter(quantity__gt=0)
+            else:
+                queryset = queryset.filter(quantity=0)
+        if "modified_since" in params:
+            queryset = queryset.filter(modified__gte=params["modified_since"])
+
+        return queryset
+
+    def get_schema_operation_parameters(self, view):
+        parameters = [
+            ("category", "integer", "Only listings of this category ID"),
+            ("min_price", "number", "Minimum price, inclusive"),
+            ("max_price", "number", "Maximum price, inclusive"),
+            ("active", "boolean", "Only active or only closed listings"),
+            ("in_stock", "boolean", "Only listings with or without stock"),
+            ("modified_since", "string", "Only listings modified at or after"),
+        ]
+        return [
+            {
+                "name": name,
+                "required": False,
+                "in": "query",
+                "description": description,
+                "schema": {"type": schema_type},
+            }
+            for name, schema_type, description in parameters
+        ]
+
+
+def _price_bucket(lower, upper):
+    condition = Q(price__gte=lower)
+    if upper is not None:
+        condition &= Q(price__lt=upper)
+    return condition
+
+
+def get_facet_counts(queryset):
+    """
+    Count the listings of ``queryset`` per category and per price bucket.
+
+    Both facets come out of a single ``GROUP BY category`` query with one
+    conditional count per price bucket.
+    """
+    buckets = {
+        f"price_{i}": Count("id", filter=_price_bucket(lower, upper))
+        for i, (lower, upper) in enumerate(PRICE_BUCKETS)
+    }
+    rows = (
+        queryset.order_by()
+        .values("category_id", "category__name")
+        .annotate(count=Count("id"), **buckets)
+    )
+
+    categories = []
+    price_counts = [0] * len(PRICE_BUCKETS)
+    for row in rows:
+        categories.append(
+            {
+                "id": row["category_id"],
+                "name": row["category__name"],
+                "count": row["count"],
+            }
+        )
+        for i in range(len(PRICE_BUCKETS)):
+            price_counts[i] += row[f"price_{i}"]
+
+    return {
+        "categories": sorted(
+            categories, key=lambda category: (-category["count"], category["name"])
+        ),
+        "price": [
+            {"min": lower, "max": upper, "count": count}
+            for (lower, upper), count in zip(PRICE_BUCKETS, price_counts)
+        ],
+    }
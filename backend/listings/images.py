@@ -0,0 +1,148 @@
+import hashlib
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .cache import invalidate_listings
+from .models import Listing
+
+logger = logging.getLogger(__name__)
+
+# name: (max width, max height, Pillow format, file extension)
+VARIANTS = {
+    "thumbnail": (200, 200, "JPEG", "jpg"),
+    "medium": (800, 800, "JPEG", "jpg"),
+    "webp": (1600, 1600, "WEBP", "webp"),
+}
+VARIANT_DIR = "listing_images/variants"
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.LISTING_IMAGE_WORKERS)
+    return _executor
+
+
+def get_variant_name(image_name, variant):
+    # The digest of the full stored name tells foo.jpg and foo.png apart
+    extension = VARIANTS[variant][3]
+    digest = hashlib.md5(image_name.encode()).hexdigest()[:12]
+    stem = PurePosixPath(image_name).stem
+    return f"{VARIANT_DIR}/{stem}_{digest}_{variant}.{extension}"
+
+
+def render_variants(source_path, targets):
+    # Runs in a worker process, so it only deals with plain file paths
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        for target_path, (width, height, image_format, _) in targets:
+            variant = image.copy()
+            variant.thumbnail((width, height))
+            if image_format == "JPEG" and variant.mode not in ("RGB", "L"):
+                variant = variant.convert("RGB")
+
+            # Write next to the target and swap it in, so a half written
+            # file is never served
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            temporary_path = f"{target_path}.tmp"
+            variant.save(temporary_path, image_format, quality=85)
+            os.replace(temporary_path, target_path)
+
+    return [target_path for target_path, _ in targets]
+
+
+def record_variants(listing_id, image_name):
+    """
+    Point the listing at the variants of ``image_name``, unless its image
+    was replaced in the meantime. Bumps ``modified`` and the listings cache
+    version so ETags and cached responses pick the new URLs up.
+    """
+    updated = Listing.objects.filter(id=listing_id, image=image_name).update(
+        image_variants={
+            variant: get_variant_name(image_name, variant) for variant in VARIANTS
+        },
+        modified=timezone.now(),
+    )
+    if updated:
+        invalidate_listings()
+
+
+def _finish(listing_id, image_name, future):
+    # Runs on a thread of the pool in this process, with its own connection
+    exception = future.exception()
+    if exception is not None:
+        logger.error("Listing image variants failed: %s", exception)
+        return
+
+    try:
+        record_variants(listing_id, image_name)
+    except Exception as exc:
+        logger.error("Recording listing image variants failed: %s", exc)
+    finally:
+        connections.close_all()
+
+
+def _submit(listing_id, image_name, source_path, targets):
+    future = get_executor().submit(render_variants, source_path, targets)
+    future.add_done_callback(partial(_finish, listing_id, image_name))
+
+
+def queue_image_variants(listing):
+    """
+    Generate the variants of the listing image on the process pool once the
+    current transaction commits.
+    """
+    image = listing.image
+    if not image:
+        return
+
+    try:
+        source_path = image.storage.path(image.name)
+        targets = [
+            (image.storage.path(get_variant_name(image.name, variant)), spec)
+            for variant, spec in VARIANTS.items()
+        ]
+    except NotImplementedError:
+        # Remote storages have no local paths for the workers to read
+        logger.warning("Cannot generate image variants for %s", image.name)
+        return
+
+    transaction.on_commit(lambda: _submit(listing.id, image.name, source_path, targets))
+
+
+def delete_image_variants(storage, image_name):
+    for variant in VARIANTS:
+        storage.delete(get_variant_name(image_name, variant))
+
+
+def discard_image_variants(image):
+    # Drop the variants of a replaced or deleted image once the change commits
+    if image:
+        storage, name = image.storage, image.name
+        transaction.on_commit(lambda: delete_image_variants(storage, name))
+
+
+def get_variant_urls(listing):
+    # Variants that are not generated yet fall back to the original image
+    if not listing.image:
+        return {}
+
+    storage = listing.image.storage
+    return {
+        variant: (
+            storage.url(listing.image_variants[variant])
+            if variant in listing.image_variants
+            else listing.image.url
+        )
+        for variant in VARIANTS
+    }
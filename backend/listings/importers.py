@@ -0,0 +1,84 @@
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from core.streams import DEFAULT_BATCH_SIZE, RecordImporter
+
+from .cache import invalidate_listings
+from .models import Category, Listing
+from .search import index_listings
+from .serializers import ListingSerializer
+
+IMPORT_FIELDS = ("title", "description", "price", "quantity", "active")
+
+# How the category column refers to a category
+CATEGORY_KEYS = ("name", "id")
+
+
+class ListingImporter(RecordImporter):
+    """
+    Import listings of ``owner`` from a CSV or JSON lines stream.
+
+    Rows go through the ``ListingSerializer`` fields and its
+    ``validate_<field>`` rules, the ``category`` column holds a category
+    name, or an ID with ``category_key="id"``. Valid rows are inserted and
+    indexed for search with one ``bulk_create`` per batch while invalid ones
+    are collected in the report.
+    """
+
+    def __init__(self, owner, batch_size=DEFAULT_BATCH_SIZE, category_key="name"):
+        if category_key not in CATEGORY_KEYS:
+            raise ValueError(f"Unsupported category key: {category_key}")
+        super().__init__(batch_size)
+        self.owner = owner
+        self.category_key = category_key
+        self.serializer = ListingSerializer()
+        self.fields = {name: self.serializer.fields[name] for name in IMPORT_FIELDS}
+        self.categories = {}
+
+    def get_category_id(self, value):
+        key = str(value).strip()
+        if key not in self.categories:
+            if self.category_key == "id" and not key.isdigit():
+                self.categories[key] = None
+                return None
+            self.categories[key] = (
+                Category.objects.filter(**{self.category_key: key})
+                .order_by("id")
+                .values_list("id", flat=True)
+                .first()
+            )
+        return self.categories[key]
+
+    def validate_field(self, name, value):
+        value = super().validate_field(name, value)
+        validate_field = getattr(self.serializer, f"validate_{name}", None)
+        if validate_field is not None:
+            value = validate_field(value)
+        return value
+
+    def validate_row(self, record):
+        attrs, errors = self.validate_fields(record)
+
+        category = record.get("category")
+        if category is None or category == "":
+            errors["category"] = ["This field is required."]
+        else:
+            attrs["category_id"] = self.get_category_id(category)
+            if attrs["category_id"] is None:
+                errors["category"] = [f"Unknown category: {category}"]
+
+        if errors:
+            raise ValidationError(errors)
+
+        # Images are referenced by their name in the media storage
+        attrs["image"] = record.get("image") or ""
+        return attrs
+
+    def flush(self, rows):
+        with transaction.atomic():
+            listings = Listing.objects.bulk_create(
+                [Listing(owner=self.owner, **attrs) for _, attrs in rows]
+            )
+            index_listings(listings)
+            invalidate_listings()
+        self.created += len(listings)
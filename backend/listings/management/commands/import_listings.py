@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.streams import FILE_FORMATS, get_file_format
+from listings.importers import CATEGORY_KEYS, DEFAULT_BATCH_SIZE, ListingImporter
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Import listings from a CSV or JSON lines file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSON lines file to import")
+        parser.add_argument(
+            "--owner", required=True, help="Email of the user owning the listings"
+        )
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=sorted(set(FILE_FORMATS.values())),
+            help="File format, guessed from the file extension by default",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of listings inserted per batch",
+        )
+        parser.add_argument(
+            "--category-key",
+            choices=CATEGORY_KEYS,
+            default="name",
+            help="Whether the category column holds category names or IDs",
+        )
+
+    def handle(self, *args, **options):
+        file_format = options["file_format"] or get_file_format(options["path"])
+        if file_format is None:
+            raise CommandError("Cannot guess the file format, use --format")
+
+        try:
+            owner = User.objects.get(email=options["owner"].lower())
+        except User.DoesNotExist as exc:
+            raise CommandError(f"User {options['owner']} does not exist") from exc
+
+        importer = ListingImporter(
+            owner,
+            batch_size=options["batch_size"],
+            category_key=options["category_key"],
+        )
+        with open(options["path"], "rb") as stream:
+            report = importer.run(stream, file_format)
+
+        for error in report["errors"]:
+            for field, messages in error["errors"].items():
+                self.stderr.write(
+                    f"Line {error['line']}: {field}: {' '.join(messages)}"
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{report['created']} listings imported, {report['failed']} rows failed"
+            )
+        )
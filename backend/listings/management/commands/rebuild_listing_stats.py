@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from listings.cache import invalidate_listings
+from listings.models import Listing, ListingStats
+from listings.stats import STAT_FIELDS, compute_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized listing stats to repair any drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of listings recomputed per batch",
+        )
+
+    def rebuild(self, listing_ids):
+        with transaction.atomic():
+            ListingStats.objects.bulk_create(
+                compute_stats(listing_ids),
+                update_conflicts=True,
+                unique_fields=["listing"],
+                update_fields=[*STAT_FIELDS, "modified"],
+            )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        batch = []
+        rebuilt = 0
+        listing_ids = Listing.objects.values_list("id", flat=True).order_by("id")
+        for listing_id in listing_ids.iterator(chunk_size=batch_size):
+            batch.append(listing_id)
+            if len(batch) >= batch_size:
+                self.rebuild(batch)
+                rebuilt += len(batch)
+                batch = []
+
+        if batch:
+            self.rebuild(batch)
+            rebuilt += len(batch)
+        invalidate_listings()
+
+        self.stdout.write(self.style.SUCCESS(f"Stats rebuilt for {rebuilt} listings"))
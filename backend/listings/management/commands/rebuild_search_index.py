@@ -0,0 +1,41 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from listings.models import Listing, SearchPosting, SearchTerm
+from listings.search import STATS_CACHE_KEY, index_listings
+
+
+class Command(BaseCommand):
+    help = "Rebuild the listing search index from scratch"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of listings indexed per batch",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        SearchPosting.objects.all().delete()
+        SearchTerm.objects.all().delete()
+
+        batch = []
+        indexed = 0
+        listings = Listing.objects.only("id", "title", "description")
+        for listing in listings.iterator(chunk_size=batch_size):
+            batch.append(listing)
+            if len(batch) >= batch_size:
+                index_listings(batch)
+                indexed += len(batch)
+                batch = []
+
+        index_listings(batch)
+        indexed += len(batch)
+        cache.delete(STATS_CACHE_KEY)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Search index rebuilt for {indexed} listings")
+        )
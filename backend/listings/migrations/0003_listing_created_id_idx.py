@@ -0,0 +1,18 @@
+# Generated by Django 5.0.8 on 2026-10-18 14:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("listings", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(fields=["created", "id"], name="listing_created_id_idx"),
+        ),
+    ]
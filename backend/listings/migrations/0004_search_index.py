@@ -0,0 +1,70 @@
+# Generated by Django 5.0.8 on 2026-10-18 14:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("listings", "0003_listing_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchTerm",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("term", models.CharField(max_length=64, unique=True)),
+                ("document_frequency", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Search term",
+                "verbose_name_plural": "Search terms",
+            },
+        ),
+        migrations.CreateModel(
+            name="SearchPosting",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("frequency", models.PositiveIntegerField()),
+                ("document_length", models.PositiveIntegerField()),
+                (
+                    "listing",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_postings",
+                        to="listings.listing",
+                    ),
+                ),
+                (
+                    "term",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="postings",
+                        to="listings.searchterm",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Search posting",
+                "verbose_name_plural": "Search postings",
+                "unique_together": {("term", "listing")},
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.8 on 2026-10-18 14:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("listings", "0004_search_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["category", "price"], name="listing_category_price_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(fields=["price"], name="listing_price_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["active", "quantity"], name="listing_active_qty_idx"
+            ),
+        ),
+    ]
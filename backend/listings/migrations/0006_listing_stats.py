@@ -0,0 +1,45 @@
+# Generated by Django 5.0.8 on 2026-10-18 14:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("listings", "0005_listing_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ListingStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("modified", models.DateTimeField(auto_now=True)),
+                ("review_count", models.PositiveIntegerField(default=0)),
+                ("rating_total", models.PositiveIntegerField(default=0)),
+                ("favorite_count", models.PositiveIntegerField(default=0)),
+                ("units_sold", models.PositiveIntegerField(default=0)),
+                (
+                    "listing",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stats",
+                        to="listings.listing",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Listing stats",
+                "verbose_name_plural": "Listing stats",
+            },
+        ),
+    ]
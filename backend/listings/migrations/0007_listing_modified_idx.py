@@ -0,0 +1,18 @@
+# Generated by Django 5.0.8 on 2026-10-18 14:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("listings", "0006_listing_stats"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(fields=["modified"], name="listing_modified_idx"),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.8 on 2026-10-18 15:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("listings", "0007_listing_modified_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="listing",
+            name="image_variants",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
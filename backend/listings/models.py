@@ -14,6 +14,9 @@ class Listing(BaseModel):
     owner = models.ForeignKey("users.User", on_delete=models.CASCADE)
     active = models.BooleanField(default=True)
     category = models.ForeignKey("Category", on_delete=models.CASCADE)
+    # {variant: stored name} of the generated image variants, see
+    # listings.images
+    image_variants = models.JSONField(default=dict, blank=True)
 
     class Meta:
         verbose_name = "Listing"
@@ -23,6 +26,18 @@ class Listing(BaseModel):
                 check=models.Q(price__gte=0), name="price_non_negative"
             )
         ]
+        indexes = [
+            # Backs the keyset pagination of the listing endpoints
+            models.Index(fields=["created", "id"], name="listing_created_id_idx"),
+            # Back the category, price range, active and in-stock filters
+            models.Index(
+                fields=["category", "price"], name="listing_category_price_idx"
+            ),
+            models.Index(fields=["price"], name="listing_price_idx"),
+            models.Index(fields=["active", "quantity"], name="listing_active_qty_idx"),
+            # Backs the modified_since filter of incremental exports
+            models.Index(fields=["modified"], name="listing_modified_idx"),
+        ]
 
     def clean(self):
         if self.price < 0:
@@ -46,6 +61,30 @@ class Listing(BaseModel):
         return self.title
 
 
+class ListingStats(BaseModel):
+    # Denormalized per-listing aggregates, maintained by listings.stats
+    listing = models.OneToOneField(
+        Listing, on_delete=models.CASCADE, related_name="stats"
+    )
+    review_count = models.PositiveIntegerField(default=0)
+    rating_total = models.PositiveIntegerField(default=0)
+    favorite_count = models.PositiveIntegerField(default=0)
+    units_sold = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Listing stats"
+        verbose_name_plural = "Listing stats"
+
+    @property
+    def average_rating(self):
+        if not self.review_count:
+            return None
+        return round(self.rating_total / self.review_count, 2)
+
+    def __str__(self):
+        return f"Stats of {self.listing_id}"
+
+
 class Category(BaseModel):
     name = models.CharField(max_length=255)
     description = models.TextField()
@@ -71,3 +110,35 @@ class Favorite(models.Model):
 
     def __str__(self):
         return f"{self.user.email} - {self.listing.title}"
+
+
+class SearchTerm(models.Model):
+    term = models.CharField(max_length=64, unique=True)
+    document_frequency = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Search term"
+        verbose_name_plural = "Search terms"
+
+    def __str__(self):
+        return self.term
+
+
+class SearchPosting(models.Model):
+    term = models.ForeignKey(
+        SearchTerm, on_delete=models.CASCADE, related_name="postings"
+    )
+    listing = models.ForeignKey(
+        Listing, on_delete=models.CASCADE, related_name="search_postings"
+    )
+    frequency = models.PositiveIntegerField()
+    document_length = models.PositiveIntegerField()
+
+    class Meta:
+        # The (term, listing) unique index doubles as the posting list lookup
+        unique_together = ("term", "listing")
+        verbose_name = "Search posting"
+        verbose_name_plural = "Search postings"
+
+    def __str__(self):
+        return f"{self.term} in {self.listing_id}"
@@ -0,0 +1,178 @@
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+from django.db.models.functions import Cast
+
+from .models import SearchPosting, SearchTerm
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Title terms are counted this many times, so title matches rank higher
+TITLE_WEIGHT = 2
+
+# Corpus statistics only need to be roughly up to date for ranking
+STATS_CACHE_KEY = "listings:search:stats"
+STATS_CACHE_TIMEOUT = 60 * 60
+
+MAX_TERM_LENGTH = 64
+CHUNK_SIZE = 500
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from in is it of on or the this to with".split()
+)
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return [
+        token
+        for token in TOKEN_RE.findall(text.lower())
+        if 1 < len(token) <= MAX_TERM_LENGTH and token not in STOP_WORDS
+    ]
+
+
+def _chunks(items, size=CHUNK_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _adjust_document_frequency(deltas):
+    # One UPDATE per distinct delta instead of one per term
+    by_delta = defaultdict(list)
+    for term_id, delta in deltas.items():
+        by_delta[delta].append(term_id)
+
+    for delta, term_ids in by_delta.items():
+        for chunk in _chunks(term_ids):
+            SearchTerm.objects.filter(id__in=chunk).update(
+                document_frequency=F("document_frequency") + delta
+            )
+
+
+@transaction.atomic
+def unindex_listings(listing_ids):
+    listing_ids = list(listing_ids)
+    postings = SearchPosting.objects.filter(listing_id__in=listing_ids)
+
+    deltas = Counter(postings.values_list("term_id", flat=True))
+    if not deltas:
+        return
+
+    _adjust_document_frequency({term_id: -n for term_id, n in deltas.items()})
+    postings.delete()
+
+
+@transaction.atomic
+def index_listings(listings):
+    """
+    (Re)index the title and description of the given listings.
+
+    The cost is a constant number of queries per batch, no matter how many
+    listings or terms are involved.
+    """
+    listings = list(listings)
+    unindex_listings(listing.pk for listing in listings)
+
+    documents = {
+        listing.pk: Counter(
+            tokenize(listing.title) * TITLE_WEIGHT + tokenize(listing.description)
+        )
+        for listing in listings
+    }
+    vocabulary = set().union(*documents.values())
+    if not vocabulary:
+        return
+
+    term_ids = {}
+    for chunk in _chunks(vocabulary):
+        SearchTerm.objects.bulk_create(
+            [SearchTerm(term=term) for term in chunk], ignore_conflicts=True
+        )
+        term_ids.update(
+            SearchTerm.objects.filter(term__in=chunk).values_list("term", "id")
+        )
+
+    deltas = Counter(term_ids[term] for counts in documents.values() for term in counts)
+    _adjust_document_frequency(deltas)
+
+    SearchPosting.objects.bulk_create(
+        [
+            SearchPosting(
+                term_id=term_ids[term],
+                listing_id=listing_id,
+                frequency=frequency,
+                document_length=counts.total(),
+            )
+            for listing_id, counts in documents.items()
+            for term, frequency in counts.items()
+        ],
+        batch_size=1000,
+    )
+
+
+def get_corpus_stats():
+    stats = cache.get(STATS_CACHE_KEY)
+    if stats is None:
+        totals = SearchPosting.objects.aggregate(
+            documents=Count("listing", distinct=True), length=Sum("frequency")
+        )
+        documents = totals["documents"] or 0
+        stats = (documents, (totals["length"] or 0) / max(documents, 1))
+        cache.set(STATS_CACHE_KEY, stats, STATS_CACHE_TIMEOUT)
+    return stats
+
+
+def _idf(document_frequency, documents):
+    return math.log(
+        1 + (documents - document_frequency + 0.5) / (document_frequency + 0.5)
+    )
+
+
+def search_listings(query, limit=20):
+    """
+    Return up to ``limit`` ``(listing_id, score)`` pairs of active listings
+    matching ``query``, best BM25 score first.
+    """
+    frequencies = dict(
+        SearchTerm.objects.filter(
+            term__in=set(tokenize(query)), document_frequency__gt=0
+        ).values_list("id", "document_frequency")
+    )
+    if not frequencies:
+        return []
+
+    documents, average_length = get_corpus_stats()
+    documents = max(documents, max(frequencies.values()))
+    average_length = average_length or 1
+
+    idf = Case(
+        *[
+            When(term_id=term_id, then=Value(_idf(df, documents)))
+            for term_id, df in frequencies.items()
+        ],
+        output_field=FloatField(),
+    )
+    frequency = Cast("frequency", FloatField())
+    length = Cast("document_length", FloatField())
+    score = (
+        idf
+        * frequency
+        * (K1 + 1)
+        / (frequency + K1 * (1 - B + B * length / average_length))
+    )
+
+    return list(
+        SearchPosting.objects.filter(term_id__in=frequencies, listing__active=True)
+        .values("listing_id")
+        .annotate(score=Sum(score, output_field=FloatField()))
+        .order_by("-score", "listing_id")
+        .values_list("listing_id", "score")[:limit]
+    )
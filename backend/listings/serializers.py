@@ -1,7 +1,12 @@
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
-from .models import Category, Favorite, Listing
+from core.serializers import SparseFieldsetMixin
+from core.streams import FILE_FORMATS, get_file_format
+from users.models import User
+
+from .images import get_variant_urls
+from .models import Category, Favorite, Listing, ListingStats
 
 
 # Global functions
@@ -10,10 +15,33 @@ def is_negative(num):
 
 
 # Serializers
-class ListingSerializer(serializers.ModelSerializer):
+class ListingStatsSerializer(serializers.ModelSerializer):
+    average_rating = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = ListingStats
+        fields = ["average_rating", "review_count", "favorite_count", "units_sold"]
+
+
+class ListingSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    variants = serializers.SerializerMethodField()
+    stats = serializers.SerializerMethodField()
+
     class Meta:
         model = Listing
-        fields = "__all__"
+        exclude = ["image_variants"]
+
+    def get_variants(self, obj):
+        urls = get_variant_urls(obj)
+        request = self.context.get("request")
+        if request is not None:
+            urls = {name: request.build_absolute_uri(url) for name, url in urls.items()}
+        return urls
+
+    def get_stats(self, obj):
+        # Listings without any review, favorite or sale have no stats row yet
+        stats = getattr(obj, "stats", None) or ListingStats(listing=obj)
+        return ListingStatsSerializer(stats).data
 
     def validate_price(self, value):
         if is_negative(value):
@@ -26,6 +54,29 @@ class ListingSerializer(serializers.ModelSerializer):
         return value
 
 
+class ListingImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    file_format = serializers.ChoiceField(
+        choices=sorted(set(FILE_FORMATS.values())), required=False
+    )
+    owner = serializers.PrimaryKeyRelatedField(
+        queryset=User.objects.all(), required=False
+    )
+    batch_size = serializers.IntegerField(
+        min_value=1, max_value=5000, required=False, default=500
+    )
+    category_key = serializers.ChoiceField(
+        choices=["name", "id"], required=False, default="name"
+    )
+
+    def validate(self, attrs):
+        if "file_format" not in attrs:
+            attrs["file_format"] = get_file_format(attrs["file"].name)
+            if attrs["file_format"] is None:
+                raise ValidationError({"file_format": "Cannot guess the file format"})
+        return attrs
+
+
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
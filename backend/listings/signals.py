@@ -0,0 +1,108 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from orders.models import Transaction
+from users.models import Review
+
+from .cache import invalidate_listings
+from .images import discard_image_variants
+from .models import Category, Favorite, Listing
+from .search import index_listings, unindex_listings
+from .stats import record_favorite, record_review, record_sales
+
+
+@receiver(post_save, sender=Listing)
+@receiver(post_delete, sender=Listing)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_listing_cache(sender, **kwargs):
+    invalidate_listings()
+
+
+@receiver(post_delete, sender=Listing)
+def delete_listing_image_variants(sender, instance, **kwargs):
+    discard_image_variants(instance.image)
+
+
+# Search index, bulk writes like the importer index their listings themselves
+SEARCH_FIELDS = ("title", "description")
+
+
+@receiver(pre_save, sender=Listing)
+def remember_previous_text(sender, instance, update_fields=None, **kwargs):
+    instance._previous_text = None
+    if instance.pk is None or (
+        update_fields is not None and not set(SEARCH_FIELDS) & set(update_fields)
+    ):
+        return
+    instance._previous_text = (
+        Listing.objects.filter(pk=instance.pk).values_list(*SEARCH_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=Listing)
+def index_saved_listing(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_previous_text", None)
+    text = tuple(getattr(instance, field) for field in SEARCH_FIELDS)
+    if created or (previous is not None and previous != text):
+        index_listings([instance])
+
+
+@receiver(pre_delete, sender=Listing)
+def unindex_deleted_listing(sender, instance, **kwargs):
+    # Before the postings cascade, their terms' document counts go down
+    unindex_listings([instance.pk])
+
+
+# Listing stats
+@receiver(pre_save, sender=Review)
+def remember_previous_review(sender, instance, **kwargs):
+    instance._previous = None
+    if instance.pk is not None:
+        instance._previous = (
+            Review.objects.filter(pk=instance.pk)
+            .values_list("listing_id", "rating")
+            .first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def count_saved_review(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_previous", None)
+    if created or previous is None:
+        record_review(instance.listing_id, instance.rating)
+        return
+
+    listing_id, rating = previous
+    if listing_id == instance.listing_id:
+        record_review(listing_id, instance.rating - rating, count=0)
+    else:
+        record_review(listing_id, -rating, count=-1, create_missing=False)
+        record_review(instance.listing_id, instance.rating)
+
+
+@receiver(post_delete, sender=Review)
+def count_deleted_review(sender, instance, **kwargs):
+    record_review(instance.listing_id, -instance.rating, count=-1, create_missing=False)
+
+
+@receiver(post_save, sender=Favorite)
+def count_saved_favorite(sender, instance, created, **kwargs):
+    if created:
+        record_favorite(instance.listing_id)
+
+
+@receiver(post_delete, sender=Favorite)
+def count_deleted_favorite(sender, instance, **kwargs):
+    record_favorite(instance.listing_id, count=-1, create_missing=False)
+
+
+@receiver(post_save, sender=Transaction)
+def count_sale(sender, instance, created, **kwargs):
+    if created:
+        record_sales({instance.listing_id: instance.quantity})
+
+
+@receiver(post_delete, sender=Transaction)
+def count_deleted_sale(sender, instance, **kwargs):
+    record_sales({instance.listing_id: -instance.quantity}, create_missing=False)
@@ -0,0 +1,116 @@
+from collections import defaultdict
+
+from django.db.models import Case, Count, F, IntegerField, Sum, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from orders.models import Transaction
+from users.models import Review
+
+from .cache import invalidate_listing_stats
+from .models import Favorite, ListingStats
+
+STAT_FIELDS = ("review_count", "rating_total", "favorite_count", "units_sold")
+
+
+def apply_deltas(deltas, create_missing=True):
+    """
+    Add ``deltas``, a ``{listing_id: {field: delta}}`` mapping, to the
+    listing stats with a single UPDATE whatever the number of listings.
+
+    Missing stats rows are first inserted empty with ``ignore_conflicts``,
+    so the UPDATE always finds every row and concurrent first increments
+    both land. Pass ``create_missing=False`` from deletion paths, where the
+    listing itself may be on its way out.
+    """
+    deltas = {
+        listing_id: {field: delta for field, delta in changes.items() if delta}
+        for listing_id, changes in deltas.items()
+    }
+    deltas = {listing_id: changes for listing_id, changes in deltas.items() if changes}
+    if not deltas:
+        return
+
+    if create_missing:
+        ListingStats.objects.bulk_create(
+            [ListingStats(listing_id=listing_id) for listing_id in deltas],
+            ignore_conflicts=True,
+        )
+
+    fields = {field for changes in deltas.values() for field in changes}
+    updates = {
+        field: Greatest(
+            F(field)
+            + Case(
+                *[
+                    When(listing_id=listing_id, then=Value(changes[field]))
+                    for listing_id, changes in deltas.items()
+                    if field in changes
+                ],
+                default=Value(0),
+                output_field=IntegerField(),
+            ),
+            Value(0),
+        )
+        for field in fields
+    }
+    ListingStats.objects.filter(listing_id__in=deltas).update(
+        modified=timezone.now(), **updates
+    )
+
+    # Only the cached responses showing these stats go stale
+    invalidate_listing_stats(deltas)
+
+
+def record_review(listing_id, rating, count=1, create_missing=True):
+    apply_deltas(
+        {listing_id: {"review_count": count, "rating_total": rating}},
+        create_missing=create_missing,
+    )
+
+
+def record_favorite(listing_id, count=1, create_missing=True):
+    apply_deltas({listing_id: {"favorite_count": count}}, create_missing)
+
+
+def record_sales(quantities, create_missing=True):
+    # quantities maps listing ids to the number of units sold
+    apply_deltas(
+        {listing_id: {"units_sold": units} for listing_id, units in quantities.items()},
+        create_missing,
+    )
+
+
+def compute_stats(listing_ids):
+    """Recompute the stats of ``listing_ids`` from the source tables."""
+    stats = defaultdict(dict)
+    reviews = (
+        Review.objects.filter(listing_id__in=listing_ids)
+        .values("listing_id")
+        .annotate(review_count=Count("id"), rating_total=Sum("rating"))
+    )
+    for row in reviews:
+        stats[row["listing_id"]].update(
+            review_count=row["review_count"], rating_total=row["rating_total"] or 0
+        )
+
+    favorites = (
+        Favorite.objects.filter(listing_id__in=listing_ids)
+        .values("listing_id")
+        .annotate(favorite_count=Count("id"))
+    )
+    for row in favorites:
+        stats[row["listing_id"]]["favorite_count"] = row["favorite_count"]
+
+    sales = (
+        Transaction.objects.filter(listing_id__in=listing_ids)
+        .values("listing_id")
+        .annotate(units_sold=Sum("quantity"))
+    )
+    for row in sales:
+        stats[row["listing_id"]]["units_sold"] = row["units_sold"] or 0
+
+    return [
+        ListingStats(listing_id=listing_id, **stats.get(listing_id, {}))
+        for listing_id in listing_ids
+    ]
@@ -0,0 +1,69 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from listings.cache import get_cache_stats
+from listings.models import Listing
+
+
+class TestListingCache:
+    @pytest.mark.django_db
+    def test_anonymous_responses_are_cached(
+        self, client, listing_fixture, django_assert_num_queries
+    ):
+        listing_url = reverse("listing-detail", args=[listing_fixture.id])
+        assert client.get(listing_url).data["title"] == "Test Listing"
+
+        with django_assert_num_queries(0):
+            assert client.get(listing_url).data["title"] == "Test Listing"
+
+        assert get_cache_stats() == {"hits": 1, "misses": 1, "hit_ratio": 0.5}
+
+    @pytest.mark.django_db
+    def test_cached_responses_are_per_host(self, client, listing_fixture):
+        listing_url = reverse("listing-detail", args=[listing_fixture.id])
+        response = client.get(listing_url, HTTP_HOST="localhost")
+        assert response.data["image"].startswith("http://localhost/")
+
+        # Absolute URLs of one host are never served to another
+        response = client.get(listing_url, HTTP_HOST="127.0.0.1", secure=True)
+        assert response.data["image"].startswith("https://127.0.0.1/")
+        assert get_cache_stats()["misses"] == 2
+
+    @pytest.mark.django_db
+    def test_writes_invalidate_cached_responses(
+        self, client, user_fixture, listing_fixture
+    ):
+        list_url = reverse("listing-list")
+        listing_url = reverse("listing-detail", args=[listing_fixture.id])
+        client.get(list_url)
+        client.get(listing_url)
+
+        # A write through the API
+        api_client = APIClient()
+        api_client.force_authenticate(user=user_fixture)
+        api_client.patch(listing_url, {"title": "Renamed"})
+        assert client.get(listing_url).data["title"] == "Renamed"
+        assert client.get(list_url).data["results"][0]["title"] == "Renamed"
+
+        # A save made directly on the model
+        listing_fixture.title = "Saved"
+        listing_fixture.save()
+        assert client.get(listing_url).data["title"] == "Saved"
+
+        # A delete
+        Listing.objects.filter(id=listing_fixture.id).delete()
+        assert client.get(listing_url).status_code == 404
+        assert client.get(list_url).data["results"] == []
+
+    @pytest.mark.django_db
+    def test_cache_stats_view(self, client, superuser_fixture, listing_fixture):
+        stats_url = reverse("listing-cache-stats")
+        client.get(reverse("listing-list"))
+        assert client.get(stats_url).status_code == 401
+
+        api_client = APIClient()
+        api_client.force_authenticate(user=superuser_fixture)
+        response = api_client.get(stats_url)
+        assert response.status_code == 200
+        assert response.data["misses"] == 1
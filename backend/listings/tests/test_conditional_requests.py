@@ -0,0 +1,85 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from listings.models import Listing
+
+
+class TestConditionalRequests:
+    @pytest.mark.django_db
+    def test_retrieve_answers_304_while_unchanged(self, listing_fixture):
+        client = APIClient()
+        listing_url = reverse("listing-detail", args=[listing_fixture.id])
+
+        response = client.get(listing_url)
+        etag = response["ETag"]
+        assert response.status_code == 200
+        assert "Last-Modified" in response
+
+        response = client.get(listing_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+        assert not response.content
+
+        # Served from the response cache, the validators still apply
+        response = client.get(
+            listing_url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        assert response.status_code == 304
+
+        listing_fixture.title = "Renamed"
+        listing_fixture.save()
+        response = client.get(listing_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    @pytest.mark.django_db
+    def test_deactivation_changes_the_validators(self, listing_fixture):
+        client = APIClient()
+        listing_url = reverse("listing-detail", args=[listing_fixture.id])
+        list_url = reverse("listing-list")
+        etag = client.get(listing_url)["ETag"]
+        list_etag = client.get(list_url)["ETag"]
+
+        client.force_authenticate(user=listing_fixture.owner)
+        response = client.patch(listing_url, {"active": False})
+        assert response.status_code == 200
+
+        client.force_authenticate(user=None)
+        response = client.get(listing_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.data["active"] is False
+        assert response["ETag"] != etag
+        assert client.get(list_url, HTTP_IF_NONE_MATCH=list_etag).status_code == 200
+
+    @pytest.mark.django_db
+    def test_list_fingerprint_tracks_changes(
+        self, user_fixture, listing_fixture, django_assert_num_queries
+    ):
+        client = APIClient()
+        client.force_authenticate(user=user_fixture)
+        list_url = reverse("listing-list")
+
+        etag = client.get(list_url)["ETag"]
+        # Only the MAX(modified) / COUNT(*) fingerprint is queried
+        with django_assert_num_queries(1):
+            response = client.get(list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        # Filters are part of the validator
+        response = client.get(list_url, {"active": "true"}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+        # A deletion changes the count
+        Listing.objects.create(
+            title="Second",
+            image="listing_images/test.jpg",
+            description="Test Description",
+            price=1,
+            quantity=1,
+            owner_id=user_fixture.id,
+            category=listing_fixture.category,
+        ).delete()
+        assert client.get(list_url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        Listing.objects.filter(id=listing_fixture.id).delete()
+        assert client.get(list_url, HTTP_IF_NONE_MATCH=etag).status_code == 200
@@ -0,0 +1,100 @@
+import os
+
+import pytest
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from conftest import delete_image
+from listings import images
+from listings.images import (
+    VARIANTS,
+    get_variant_name,
+    record_variants,
+    render_variants,
+)
+from listings.models import Listing
+
+
+class TestImageVariants:
+    def test_render_variants(self, tmp_path):
+        source = tmp_path / "source.png"
+        Image.new("RGBA", (2000, 1000)).save(source)
+        targets = [
+            (str(tmp_path / get_variant_name("source.png", variant)), spec)
+            for variant, spec in VARIANTS.items()
+        ]
+
+        render_variants(str(source), targets)
+
+        sizes = {}
+        for (path, spec), variant in zip(targets, VARIANTS):
+            with Image.open(path) as image:
+                assert image.format == spec[2]
+                sizes[variant] = image.size
+        assert sizes == {
+            "thumbnail": (200, 100),
+            "medium": (800, 400),
+            "webp": (1600, 800),
+        }
+
+    @pytest.mark.django_db
+    def test_upload_queues_variants_after_commit(
+        self,
+        monkeypatch,
+        user_fixture,
+        category_fixture,
+        image_fixture,
+        django_capture_on_commit_callbacks,
+    ):
+        submitted = []
+        monkeypatch.setattr(images, "_submit", lambda *args: submitted.append(args))
+        client = APIClient()
+        client.force_authenticate(user=user_fixture)
+
+        data = {
+            "title": "Test Listing",
+            "image": image_fixture,
+            "description": "Test Description",
+            "price": 100.00,
+            "quantity": 10,
+            "owner": user_fixture.id,
+            "category": category_fixture.id,
+        }
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(reverse("listing-list"), data, format="multipart")
+        assert response.status_code == 201
+
+        # The request only queues the work, generated later by the pool
+        ((listing_id, image_name, source_path, targets),) = submitted
+        listing = Listing.objects.get(id=response.data["id"])
+        assert (listing_id, image_name) == (listing.id, listing.image.name)
+        assert source_path == listing.image.path
+        assert len(targets) == len(VARIANTS)
+
+        # Until then the variants fall back to the original image
+        assert set(response.data["variants"]) == set(VARIANTS)
+        assert set(response.data["variants"].values()) == {response.data["image"]}
+
+        # Finished variants are recorded on the listing and its ETag changes
+        listing_url = reverse("listing-detail", args=[listing.id])
+        etag = client.get(listing_url)["ETag"]
+        render_variants(source_path, targets)
+        record_variants(listing_id, image_name)
+        response = client.get(listing_url)
+        assert response["ETag"] != etag
+        assert response.data["variants"]["webp"].endswith(
+            get_variant_name(listing.image.name, "webp")
+        )
+        variant_paths = [path for path, _ in targets]
+
+        # Deleting the listing deletes its variants
+        with django_capture_on_commit_callbacks(execute=True):
+            client.delete(listing_url)
+        assert not any(os.path.exists(path) for path in variant_paths)
+        delete_image(listing.image)
+
+    def test_variant_names_are_unique_per_image(self):
+        assert get_variant_name("listing_images/foo.jpg", "thumbnail") != (
+            get_variant_name("listing_images/foo.png", "thumbnail")
+        )
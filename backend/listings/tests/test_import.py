@@ -0,0 +1,189 @@
+import io
+import json
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from conftest import csv_file, get_error_lines
+from core.streams import RecordError, iter_records
+from listings.importers import ListingImporter
+from listings.models import Category, Listing
+from listings.search import search_listings
+
+CSV_ROWS = csv_file(
+    "title,description,price,quantity,category,active",
+    "Red bike,Barely used,120.50,2,Test Category,",
+    "Blue bike,Like new,-5,1,Test Category,true",
+    "Green bike,Old,30,1,Unknown,false",
+    "Helmet,Any size,15,4,Test Category,false",
+)
+
+
+class TestStreams:
+    def test_iter_records(self):
+        stream = io.BytesIO(b'{"title": "a"}\n\nnot json\n[1]\n')
+        records = list(iter_records(stream, "jsonl"))
+
+        assert records[0] == (1, {"title": "a"})
+        assert [line for line, _ in records[1:]] == [3, 4]
+        assert all(isinstance(record, RecordError) for _, record in records[1:])
+
+        stream = io.BytesIO(b"\xef\xbb\xbftitle,price\nbike,10\nhelmet,5,extra\n")
+        records = list(iter_records(stream, "csv"))
+        assert records[0] == (2, {"title": "bike", "price": "10"})
+        assert isinstance(records[1][1], RecordError)
+
+    def test_iter_records_stops_at_invalid_utf8(self):
+        stream = io.BytesIO(b"title\nbike\n" + b"x" * 10000 + b"\xff\n")
+        records = list(iter_records(stream, "csv"))
+
+        assert records[0] == (2, {"title": "bike"})
+        assert isinstance(records[-1][1], RecordError)
+        assert "UTF-8" in str(records[-1][1])
+
+
+class TestListingImport:
+    @pytest.mark.django_db
+    def test_import_reports_invalid_rows(self, user_fixture, category_fixture):
+        importer = ListingImporter(user_fixture, batch_size=1)
+        report = importer.run(io.BytesIO(CSV_ROWS), "csv")
+
+        assert report["created"] == 2
+        assert report["failed"] == 2
+        assert get_error_lines(report) == [(3, ["price"]), (4, ["category"])]
+
+        red_bike = Listing.objects.get(title="Red bike")
+        assert red_bike.owner == user_fixture
+        assert red_bike.active
+        assert not Listing.objects.get(title="Helmet").active
+        # Imported listings are searchable right away
+        assert [pk for pk, _ in search_listings("bike")] == [red_bike.id]
+
+    @pytest.mark.django_db
+    def test_import_category_key(self, user_fixture, category_fixture):
+        numbered = Category.objects.create(name="2024")
+        rows = csv_file(
+            "title,description,price,quantity,category",
+            "Bike,Used,10,1,2024",
+            f"Helmet,New,5,1,{category_fixture.id}",
+        )
+
+        # Names by default, even when they look like an ID
+        report = ListingImporter(user_fixture).run(io.BytesIO(rows), "csv")
+        assert report["created"] == 1
+        assert Listing.objects.get(title="Bike").category == numbered
+
+        importer = ListingImporter(user_fixture, category_key="id")
+        report = importer.run(io.BytesIO(rows), "csv")
+        assert report["created"] == 1
+        assert [error["line"] for error in report["errors"]] == [2]
+        assert Listing.objects.get(title="Helmet").category == category_fixture
+
+    @pytest.mark.django_db
+    def test_import_keeps_rows_before_invalid_utf8(
+        self, user_fixture, category_fixture
+    ):
+        rows = CSV_ROWS + b"Lamp,\xff,10,1,Test Category,\n"
+        report = ListingImporter(user_fixture).run(io.BytesIO(rows), "csv")
+
+        assert report["created"] == 2
+        assert report["failed"] == 3
+        assert report["errors"][-1]["line"] == 6
+        assert "UTF-8" in report["errors"][-1]["errors"]["non_field_errors"][0]
+
+    @pytest.mark.django_db
+    def test_import_query_count_is_constant(self, user_fixture, category_fixture):
+        def import_rows(count):
+            rows = "".join(
+                json.dumps(
+                    {
+                        "title": "Listing",
+                        "description": "Test",
+                        "price": "10.00",
+                        "quantity": 1,
+                        "category": "Test Category",
+                    }
+                )
+                + "\n"
+                for _ in range(count)
+            ).encode()
+            importer = ListingImporter(user_fixture, batch_size=100)
+            with CaptureQueriesContext(connection) as captured:
+                assert importer.run(io.BytesIO(rows), "jsonl")["created"] == count
+            return [query["sql"] for query in captured.captured_queries]
+
+        queries = import_rows(10)
+        # The category is looked up once and every batch costs the same
+        assert len([sql for sql in queries if "listings_category" in sql]) == 1
+        assert len(import_rows(50)) == len(queries)
+
+    @pytest.mark.django_db
+    def test_import_command(self, tmp_path, user_fixture, category_fixture):
+        path = tmp_path / "listings.csv"
+        path.write_bytes(CSV_ROWS)
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command(
+            "import_listings",
+            str(path),
+            owner=user_fixture.email,
+            stdout=stdout,
+            stderr=stderr,
+        )
+
+        assert "2 listings imported, 2 rows failed" in stdout.getvalue()
+        assert "Line 3: price" in stderr.getvalue()
+        assert Listing.objects.count() == 2
+
+        path.write_bytes(b"title,price\n\xff,10\n")
+        call_command(
+            "import_listings",
+            str(path),
+            owner=user_fixture.email,
+            stdout=stdout,
+            stderr=stderr,
+        )
+        assert (
+            "Line 2: non_field_errors: File must be UTF-8 encoded" in stderr.getvalue()
+        )
+
+    @pytest.mark.django_db
+    def test_import_endpoint(self, user_fixture, superuser_fixture, category_fixture):
+        client = APIClient()
+        import_url = reverse("listing-import-listings")
+        rows = CSV_ROWS
+
+        def upload():
+            return {"file": SimpleUploadedFile("listings.csv", rows)}
+
+        client.force_authenticate(user=user_fixture)
+        response = client.post(import_url, upload(), format="multipart")
+        assert response.status_code == 403
+
+        client.force_authenticate(user=superuser_fixture)
+        response = client.post(import_url, upload(), format="multipart")
+        assert response.status_code == 200
+        assert response.data["created"] == 2
+        assert Listing.objects.filter(owner=superuser_fixture).count() == 2
+
+        response = client.post(
+            import_url,
+            {"file": SimpleUploadedFile("listings.txt", rows)},
+            format="multipart",
+        )
+        assert response.status_code == 400
+
+        # Rows before bytes that are not UTF-8 are kept and reported
+        response = client.post(
+            import_url,
+            {"file": SimpleUploadedFile("listings.csv", rows + b"\xff\n")},
+            format="multipart",
+        )
+        assert response.status_code == 200
+        assert response.data["created"] == 2
+        assert response.data["errors"][-1]["line"] == 6
@@ -1,4 +1,6 @@
 # Remove imports
+import json
+
 import pytest
 from django.urls import reverse
 from rest_framework.exceptions import ValidationError
@@ -7,7 +9,7 @@ from rest_framework.test import APIClient
 from conftest import delete_image
 
 # Local imports
-from listings.models import Listing
+from listings.models import Category, Listing
 
 
 class TestListingsModel:
@@ -82,7 +84,44 @@ class TestListingViews:
         listing_url = reverse("listing-list")
         response = client.get(listing_url)
         assert response.status_code == 200
-        assert len(response.data) == 1
+        assert len(response.data["results"]) == 1
+        assert response.data["next"] is None
+        assert response.data["previous"] is None
+
+    @pytest.mark.django_db
+    def test_listing_list_view_pagination(self, client, user_fixture, category_fixture):
+        for i in range(5):
+            Listing.objects.create(
+                title=f"Test Listing {i}",
+                image="listing_images/test.jpg",
+                description="Test Description",
+                price=100.00,
+                quantity=10,
+                owner_id=user_fixture.id,
+                category=category_fixture,
+            )
+
+        # Walk forward through the pages, newest listing first
+        titles = []
+        url = reverse("listing-list") + "?page_size=2"
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            titles += [listing["title"] for listing in response.data["results"]]
+            last_page = response.data
+            url = response.data["next"]
+        assert titles == [f"Test Listing {i}" for i in reversed(range(5))]
+
+        # Walk back from the last page
+        response = client.get(last_page["previous"])
+        assert [listing["title"] for listing in response.data["results"]] == [
+            "Test Listing 2",
+            "Test Listing 1",
+        ]
+
+        # Tampered cursors are rejected
+        response = client.get(reverse("listing-list") + "?cursor=invalid")
+        assert response.status_code == 404
 
     @pytest.mark.django_db
     def test_listing_detail_view(self, client, listing_fixture):
@@ -168,3 +207,107 @@ class TestListingViews:
         response = client.delete(listing_url)
         assert response.status_code == 204
         assert Listing.objects.filter(id=listing_fixture.id).count() == 0
+
+    @pytest.mark.django_db
+    def test_listing_list_view_filters_and_facets(
+        self, client, user_fixture, category_fixture, django_assert_num_queries
+    ):
+        other_category = Category.objects.create(name="Other", description="Other")
+        for title, price, quantity, category in [
+            ("Cheap", 10, 5, category_fixture),
+            ("Mid", 60, 0, category_fixture),
+            ("Pricey", 600, 1, other_category),
+        ]:
+            Listing.objects.create(
+                title=title,
+                image="listing_images/test.jpg",
+                description="Test Description",
+                price=price,
+                quantity=quantity,
+                owner_id=user_fixture.id,
+                category=category,
+            )
+        listing_url = reverse("listing-list")
+
+        def titles(params):
+            response = client.get(listing_url, params)
+            assert response.status_code == 200
+            return sorted(listing["title"] for listing in response.data["results"])
+
+        assert titles({"category": category_fixture.id}) == ["Cheap", "Mid"]
+        assert titles({"min_price": 50, "max_price": 100}) == ["Mid"]
+        assert titles({"in_stock": "true"}) == ["Cheap", "Pricey"]
+        assert titles({"in_stock": "false"}) == ["Mid"]
+        assert titles({"active": "false"}) == []
+        assert client.get(listing_url, {"min_price": "abc"}).status_code == 400
+
+        # Fingerprint, page and facets: the facets take a single query
+        with django_assert_num_queries(3):
+            response = client.get(listing_url, {"in_stock": "true", "facets": "true"})
+        facets = response.data["facets"]
+        assert [(c["name"], c["count"]) for c in facets["categories"]] == [
+            ("Other", 1),
+            ("Test Category", 1),
+        ]
+        assert [bucket["count"] for bucket in facets["price"]] == [1, 0, 0, 0, 0, 1]
+        assert "facets" not in client.get(listing_url).data
+
+    @pytest.mark.django_db
+    def test_listing_sparse_fieldsets(
+        self, client, listing_fixture, django_assert_num_queries
+    ):
+        listing_url = reverse("listing-detail", args=[listing_fixture.id])
+
+        response = client.get(listing_url, {"fields": "id,title,price"})
+        assert response.status_code == 200
+        assert set(response.data) == {"id", "title", "price"}
+
+        response = client.get(listing_url, {"omit": "description,stats"})
+        assert "description" not in response.data
+        assert "stats" not in response.data
+        assert response.data["title"] == "Test Listing"
+
+        # Pruned fields are not loaded from the database either, the first
+        # query is the conditional GET fingerprint
+        with django_assert_num_queries(2) as captured:
+            client.get(reverse("listing-list"), {"fields": "id,title"})
+        fingerprint, page = (query["sql"] for query in captured.captured_queries)
+        assert '"title"' in page and '"description"' not in page
+        assert "listingstats" not in fingerprint and "listingstats" not in page
+
+        # Same for the detail view, whose ETag then leaves the stats out
+        with django_assert_num_queries(1) as captured:
+            client.get(listing_url, {"omit": "stats"})
+        assert "listingstats" not in captured.captured_queries[0]["sql"]
+
+        response = client.get(listing_url, {"fields": "id,unknown"})
+        assert response.status_code == 400
+
+    @pytest.mark.django_db
+    def test_listing_export_view(self, user_fixture, listing_fixture):
+        client = APIClient()
+        export_url = reverse("listing-export")
+        assert client.get(export_url).status_code == 401
+
+        client.force_authenticate(user=user_fixture)
+        response = client.get(export_url)
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/x-ndjson"
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).decode().splitlines()
+        ]
+        assert len(rows) == 1
+        assert rows[0]["title"] == "Test Listing"
+        assert rows[0]["price"] == "100.00"
+
+        response = client.get(export_url, {"output": "csv"})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert lines[0].startswith("id,title,description,price")
+        assert len(lines) == 2
+
+        response = client.get(
+            export_url, {"modified_since": "2999-01-01T00:00:00Z", "output": "csv"}
+        )
+        assert len(b"".join(response.streaming_content).splitlines()) == 1
+        assert client.get(export_url, {"output": "xml"}).status_code == 400
@@ -0,0 +1,95 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from listings.models import Listing, SearchPosting, SearchTerm
+from listings.search import index_listings, search_listings, tokenize
+
+
+def create_listing(owner, category, title, description):
+    return Listing.objects.create(
+        title=title,
+        image="listing_images/test.jpg",
+        description=description,
+        price=100.00,
+        quantity=10,
+        owner_id=owner.id,
+        category=category,
+    )
+
+
+class TestSearchIndex:
+    def test_tokenize(self):
+        assert tokenize("The Red-Bike, for SALE!") == ["red", "bike", "sale"]
+
+    @pytest.mark.django_db
+    def test_search_ranks_title_matches_first(self, user_fixture, category_fixture):
+        in_description = create_listing(
+            user_fixture, category_fixture, "Road helmet", "Fits any bike"
+        )
+        in_title = create_listing(
+            user_fixture, category_fixture, "Mountain bike", "Full suspension"
+        )
+        create_listing(user_fixture, category_fixture, "Kettle", "Stainless steel")
+        index_listings(Listing.objects.all())
+
+        ranked = [pk for pk, _ in search_listings("bike")]
+        assert ranked == [in_title.id, in_description.id]
+        assert search_listings("unknown") == []
+
+    @pytest.mark.django_db
+    def test_index_follows_model_saves(self, user_fixture, category_fixture):
+        # Admin and shell edits go through save() and delete(), not the views
+        listing = create_listing(
+            user_fixture, category_fixture, "Mountain bike", "Full suspension"
+        )
+        assert [pk for pk, _ in search_listings("bike")] == [listing.id]
+
+        listing.description = "Steel kettle"
+        listing.save()
+        assert search_listings("suspension") == []
+        assert [pk for pk, _ in search_listings("kettle")] == [listing.id]
+
+        listing.delete()
+        assert not SearchPosting.objects.exists()
+        assert SearchTerm.objects.get(term="bike").document_frequency == 0
+
+    @pytest.mark.django_db
+    def test_rebuild_search_index_command(self, user_fixture, category_fixture):
+        listing = create_listing(
+            user_fixture, category_fixture, "Mountain bike", "Full suspension"
+        )
+        call_command("rebuild_search_index", stdout=None)
+
+        assert [pk for pk, _ in search_listings("suspension")] == [listing.id]
+        assert SearchTerm.objects.get(term="bike").document_frequency == 1
+
+
+class TestSearchViews:
+    @pytest.mark.django_db
+    def test_search_follows_listing_writes(self, user_fixture, category_fixture):
+        client = APIClient()
+        client.force_authenticate(user=user_fixture)
+        listing = create_listing(
+            user_fixture, category_fixture, "Mountain bike", "Full suspension"
+        )
+        index_listings([listing])
+        search_url = reverse("listing-search")
+
+        response = client.get(search_url, {"q": "bike"})
+        assert response.status_code == 200
+        assert [item["id"] for item in response.data["results"]] == [listing.id]
+
+        # Renaming the listing moves it in the index
+        listing_url = reverse("listing-detail", args=[listing.id])
+        response = client.patch(listing_url, {"title": "Kettle"})
+        assert response.status_code == 200
+        assert client.get(search_url, {"q": "bike"}).data["results"] == []
+        response = client.get(search_url, {"q": "kettle"})
+        assert [item["id"] for item in response.data["results"]] == [listing.id]
+        assert SearchTerm.objects.get(term="bike").document_frequency == 0
+
+        # Deleting the listing drops its postings
+        client.delete(listing_url)
+        assert not SearchPosting.objects.exists()
@@ -0,0 +1,116 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from conftest import User, sell
+from listings.cache import get_cache_stats
+from listings.models import Favorite, Listing, ListingStats
+from users.models import Review
+
+
+def get_stats(listing):
+    return ListingStats.objects.get(listing=listing)
+
+
+class TestListingStats:
+    @pytest.mark.django_db
+    def test_stats_follow_reviews_favorites_and_sales(
+        self, user_fixture, listing_fixture
+    ):
+        buyer = User.objects.create_user(email="buyer@test.com", password="test")
+
+        review = Review.objects.create(
+            user=user_fixture, listing=listing_fixture, rating=4, comment="Good"
+        )
+        Review.objects.create(
+            user=buyer, listing=listing_fixture, rating=1, comment="Bad"
+        )
+        assert get_stats(listing_fixture).average_rating == 2.5
+
+        review.rating = 5
+        review.save()
+        assert get_stats(listing_fixture).average_rating == 3
+
+        review.delete()
+        stats = get_stats(listing_fixture)
+        assert (stats.review_count, stats.rating_total) == (1, 1)
+
+        favorite = Favorite.objects.create(user=buyer, listing=listing_fixture)
+        assert get_stats(listing_fixture).favorite_count == 1
+        favorite.delete()
+        assert get_stats(listing_fixture).favorite_count == 0
+
+        sell(buyer, listing_fixture, 3, 300)
+        assert get_stats(listing_fixture).units_sold == 3
+
+    @pytest.mark.django_db
+    def test_stats_update_is_a_single_update(
+        self, user_fixture, listing_fixture, django_assert_num_queries
+    ):
+        Favorite.objects.create(user=user_fixture, listing=listing_fixture)
+        owner = listing_fixture.owner
+        # The favorite insert, the stats row insert that is ignored as the
+        # row exists, and the stats update
+        with django_assert_num_queries(3):
+            Favorite.objects.create(user=owner, listing=listing_fixture)
+        assert get_stats(listing_fixture).favorite_count == 2
+
+    @pytest.mark.django_db
+    def test_stats_only_expire_the_responses_showing_them(
+        self, client, user_fixture, listing_fixture, category_fixture
+    ):
+        other = Listing.objects.create(
+            title="Other",
+            description="Other",
+            price=5,
+            quantity=1,
+            owner=user_fixture,
+            category=category_fixture,
+        )
+        listing_url = reverse("listing-detail", args=[listing_fixture.id])
+        other_url = reverse("listing-detail", args=[other.id])
+        client.get(listing_url)
+        client.get(other_url)
+
+        Favorite.objects.create(user=user_fixture, listing=listing_fixture)
+        assert client.get(listing_url).data["stats"]["favorite_count"] == 1
+        client.get(other_url)
+        assert get_cache_stats() == {"hits": 1, "misses": 3, "hit_ratio": 0.25}
+
+    @pytest.mark.django_db
+    def test_rebuild_listing_stats_command(self, user_fixture, listing_fixture):
+        Review.objects.create(
+            user=user_fixture, listing=listing_fixture, rating=4, comment="Good"
+        )
+        ListingStats.objects.filter(listing=listing_fixture).update(
+            review_count=7, favorite_count=3
+        )
+
+        call_command("rebuild_listing_stats", stdout=None)
+
+        stats = get_stats(listing_fixture)
+        assert (stats.review_count, stats.rating_total, stats.favorite_count) == (
+            1,
+            4,
+            0,
+        )
+
+    @pytest.mark.django_db
+    def test_listing_serializer_embeds_stats(self, user_fixture, listing_fixture):
+        client = APIClient()
+        listing_url = reverse("listing-detail", args=[listing_fixture.id])
+        etag = client.get(listing_url)["ETag"]
+
+        response = client.get(listing_url)
+        assert response.data["stats"] == {
+            "average_rating": None,
+            "review_count": 0,
+            "favorite_count": 0,
+            "units_sold": 0,
+        }
+
+        Favorite.objects.create(user=user_fixture, listing=listing_fixture)
+        response = client.get(listing_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.data["stats"]["favorite_count"] == 1
@@ -12,6 +12,8 @@ from rest_framework.authentication import (
 )
 from rest_framework.permissions import IsAdminUser
 
+from core.views import ConditionalGetMixin
+
 from ..models import Category
 from ..serializers import CategorySerializer
 
@@ -166,7 +168,7 @@ from ..serializers import CategorySerializer
         tags=["Categories"],
     ),
 )
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     authentication_classes = [
@@ -7,6 +7,8 @@ from drf_spectacular.utils import (
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 
+from core.views import ConditionalGetMixin
+
 from ..models import Favorite
 from ..serializers import FavoriteSerializer
 
@@ -157,11 +159,11 @@ from ..serializers import FavoriteSerializer
         tags=["Favorites"],
     ),
 )
-class FavoriteViewSet(viewsets.ModelViewSet):
+class FavoriteViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Favorite.objects.all()
     serializer_class = FavoriteSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         # Only return favorites of the logged-in user
-        return self.queryset.filter(user=self.request.user)
+        return self.queryset.filter(user_id=self.request.user.id)
@@ -1,21 +1,81 @@
-from drf_spectacular.utils import extend_schema, extend_schema_view
-from rest_framework import status, viewsets
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
+from rest_framework import serializers, status, viewsets
 from rest_framework.authentication import (
     BasicAuthentication,
     SessionAuthentication,
     TokenAuthentication,
 )
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import (
+    SAFE_METHODS,
+    IsAdminUser,
+    IsAuthenticated,
+    IsAuthenticatedOrReadOnly,
+)
 from rest_framework.response import Response
 
+from core.pagination import KeysetPagination
+from core.serializers import get_sparse_fieldset
+from core.streams import iter_lines
+from core.views import ConditionalGetMixin
+
+from ..cache import cache_anonymous_response, get_cache_stats
+from ..filters import ListingFilterBackend, get_facet_counts
+from ..images import discard_image_variants, queue_image_variants
+from ..importers import ListingImporter
 from ..models import Listing
-from ..serializers import ListingSerializer
+from ..search import search_listings
+from ..serializers import ListingImportSerializer, ListingSerializer
+
+MAX_SEARCH_RESULTS = 100
+
+EXPORT_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "price",
+    "quantity",
+    "active",
+    "owner_id",
+    "category_id",
+    "image",
+    "created",
+    "modified",
+)
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_CONTENT_TYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+
+SPARSE_FIELDSET_PARAMETERS = [
+    OpenApiParameter(
+        "fields",
+        OpenApiTypes.STR,
+        description="Comma separated fields to return, e.g. `id,title,price`",
+    ),
+    OpenApiParameter(
+        "omit", OpenApiTypes.STR, description="Comma separated fields to leave out"
+    ),
+]
 
 
 @extend_schema_view(
     list=extend_schema(
         summary="List all listings",
-        description="Returns a list of all listings in the system.",
+        description=(
+            "Returns a page of listings, newest first. "
+            "Use the `next` and `previous` cursors to move between pages. "
+            "Pass `facets=true` to also get the listing counts per category "
+            "and per price bucket of the filtered listings."
+        ),
+        parameters=[
+            OpenApiParameter(
+                "facets", OpenApiTypes.BOOL, description="Include facet counts"
+            ),
+            *SPARSE_FIELDSET_PARAMETERS,
+        ],
         responses={200: ListingSerializer(many=True)},
         tags=["Listings"],
     ),
@@ -29,6 +89,7 @@ from ..serializers import ListingSerializer
     retrieve=extend_schema(
         summary="Get a listing by ID",
         description="Retrieve a listing by its ID.",
+        parameters=SPARSE_FIELDSET_PARAMETERS,
         responses={200: ListingSerializer},
         tags=["Listings"],
     ),
@@ -53,7 +114,7 @@ from ..serializers import ListingSerializer
         tags=["Listings"],
     ),
 )
-class ListingViewSet(viewsets.ModelViewSet):
+class ListingViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Listing.objects.all()
     serializer_class = ListingSerializer
     authentication_classes = [
@@ -62,6 +123,94 @@ class ListingViewSet(viewsets.ModelViewSet):
         BasicAuthentication,
     ]
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = KeysetPagination
+    filter_backends = [ListingFilterBackend]
+    modified_fields = ("modified", "stats__modified")
+
+    # Model columns each serializer field reads when it is not the column
+    # of its source. Used to defer the columns of pruned fields.
+    field_columns = {"variants": {"image", "image_variants"}, "stats": set()}
+
+    @classmethod
+    def get_columns(cls):
+        # {serializer field: model columns}, worked out once per class
+        if "_columns" not in cls.__dict__:
+            fields = cls.serializer_class().fields
+            cls._columns = {
+                name: cls.field_columns.get(name, {field.source.split(".")[0]})
+                for name, field in fields.items()
+            }
+        return cls._columns
+
+    def get_kept_fields(self):
+        # Fields left after ?fields= / ?omit=, every field on writes
+        columns = self.get_columns()
+        if self.request.method not in SAFE_METHODS:
+            return set(columns)
+        return get_sparse_fieldset(self.request, columns)
+
+    def get_modified_fields(self):
+        if "stats" in self.get_kept_fields():
+            return self.modified_fields
+        return ("modified",)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        kept = self.get_kept_fields()
+        if "stats" in kept:
+            queryset = queryset.select_related("stats")
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+
+        # Columns of fields left out are never read, the timestamps stay
+        # loaded for the ETag and the pagination cursor
+        columns = self.get_columns()
+        needed = {"created", "modified"}
+        for name in kept:
+            needed |= columns[name]
+
+        deferred = [
+            field.name
+            for field in Listing._meta.concrete_fields
+            if not field.primary_key and field.name not in needed
+        ]
+        return queryset.defer(*deferred) if deferred else queryset
+
+    @cache_anonymous_response
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+
+        if response.status_code == status.HTTP_200_OK and (
+            serializers.BooleanField().to_internal_value(
+                request.query_params.get("facets", False)
+            )
+        ):
+            response.data["facets"] = get_facet_counts(
+                self.filter_queryset(self.get_queryset())
+            )
+
+        return response
+
+    @cache_anonymous_response
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    # Queue the image variants of new uploads, the search index follows the
+    # listing signals
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            listing = serializer.save()
+            queue_image_variants(listing)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            if "image" in serializer.validated_data:
+                # The variants of the replaced image go, new ones are queued
+                discard_image_variants(serializer.instance.image)
+                listing = serializer.save(image_variants={})
+                queue_image_variants(listing)
+            else:
+                serializer.save()
 
     def partial_update(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -70,8 +219,140 @@ class ListingViewSet(viewsets.ModelViewSet):
 
         if "active" in serializer.validated_data:
             instance.active = serializer.validated_data["active"]
-            instance.save(update_fields=["active"])
+            # auto_now only writes modified when it is listed
+            instance.save(update_fields=["active", "modified"])
         else:
             self.perform_update(serializer)
 
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        summary="Search listings",
+        description=(
+            "Full-text search over the title and description of active "
+            "listings. Results are ranked by relevance, best match first."
+        ),
+        parameters=[
+            OpenApiParameter("q", OpenApiTypes.STR, description="Search terms"),
+            OpenApiParameter(
+                "limit",
+                OpenApiTypes.INT,
+                description=f"Maximum number of results (max {MAX_SEARCH_RESULTS})",
+            ),
+        ],
+        responses={200: ListingSerializer(many=True)},
+        tags=["Listings"],
+    )
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        try:
+            limit = int(request.query_params.get("limit", 20))
+        except ValueError:
+            raise serializers.ValidationError({"limit": "Must be an integer"}) from None
+        limit = min(max(limit, 1), MAX_SEARCH_RESULTS)
+
+        ranked = search_listings(request.query_params.get("q", ""), limit)
+        listings = self.get_queryset().in_bulk([pk for pk, _ in ranked])
+
+        results = []
+        for pk, score in ranked:
+            if pk in listings:
+                data = self.get_serializer(listings[pk]).data
+                data["score"] = round(score, 4)
+                results.append(data)
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        summary="Listing cache statistics",
+        description="Hit and miss counts of the anonymous listing response cache.",
+        responses={200: OpenApiTypes.OBJECT},
+        tags=["Listings"],
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="cache-stats",
+        permission_classes=[IsAdminUser],
+    )
+    def cache_stats(self, request):
+        return Response(get_cache_stats(), status=status.HTTP_200_OK)
+
+    @extend_schema(
+        summary="Import listings",
+        description=(
+            "Bulk import listings from a CSV or JSON lines file. Rows are "
+            "validated like single listings, invalid rows are reported with "
+            "their line number and skipped. The `category` column holds "
+            "category names, or IDs with `category_key=id`."
+        ),
+        request={"multipart/form-data": ListingImportSerializer},
+        responses={200: OpenApiTypes.OBJECT},
+        tags=["Listings"],
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        permission_classes=[IsAdminUser],
+        parser_classes=[MultiPartParser],
+    )
+    def import_listings(self, request):
+        serializer = ListingImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        importer = ListingImporter(
+            data.get("owner", request.user),
+            batch_size=data["batch_size"],
+            category_key=data["category_key"],
+        )
+        report = importer.run(data["file"], data["file_format"])
+        return Response(report, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        summary="Export listings",
+        description=(
+            "Stream every listing matching the filters as CSV or newline "
+            "delimited JSON, ordered by ID."
+        ),
+        parameters=[
+            OpenApiParameter(
+                "output",
+                OpenApiTypes.STR,
+                enum=["jsonl", "csv"],
+                description="Export format, `jsonl` by default",
+            ),
+        ],
+        responses={200: OpenApiTypes.BINARY},
+        tags=["Listings"],
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[IsAuthenticated],
+        pagination_class=None,
+    )
+    def export(self, request):
+        # "format" is taken by DRF's renderer negotiation
+        file_format = request.query_params.get("output", "jsonl")
+        if file_format not in EXPORT_CONTENT_TYPES:
+            raise serializers.ValidationError(
+                {"output": f"Must be one of {', '.join(EXPORT_CONTENT_TYPES)}"}
+            )
+
+        # Rows are read from the database cursor as the response is sent
+        rows = (
+            self.filter_queryset(Listing.objects.all())
+            .order_by("id")
+            .values_list(*EXPORT_FIELDS)
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+        response = StreamingHttpResponse(
+            iter_lines(EXPORT_FIELDS, rows, file_format),
+            content_type=EXPORT_CONTENT_TYPES[file_format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="listings.{file_format}"'
+        )
+        return response
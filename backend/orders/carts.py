@@ -0,0 +1,66 @@
+from django.db import transaction
+from django.db.models import Count, Min
+
+from .models import Cart, CartItem, StockReservation
+
+MERGE_BATCH_SIZE = 500
+
+
+def merge_duplicate_carts(batch_size=MERGE_BATCH_SIZE):
+    """
+    Fold every extra cart of a buyer into their oldest one, ``batch_size``
+    buyers per transaction. Items of the same listing are merged into one,
+    the holds of merged items are released. Returns the number of carts
+    removed.
+    """
+    duplicated = (
+        Cart.objects.order_by("buyer_id")
+        .values("buyer_id")
+        .annotate(carts=Count("id"), kept=Min("id"))
+        .filter(carts__gt=1)
+    )
+    removed = 0
+    last_buyer = None
+    while True:
+        batch = duplicated
+        if last_buyer is not None:
+            batch = batch.filter(buyer_id__gt=last_buyer)
+        kept = {row["buyer_id"]: row["kept"] for row in batch[:batch_size]}
+        if not kept:
+            return removed
+        last_buyer = max(kept)
+
+        with transaction.atomic():
+            carts = list(Cart.objects.filter(buyer_id__in=kept).order_by("id"))
+            buyers = {cart.id: cart.buyer_id for cart in carts}
+
+            # The kept cart takes the first coupon found
+            kept_carts = {cart.id: cart for cart in carts if cart.id in kept.values()}
+            for cart in carts:
+                kept_cart = kept_carts[kept[cart.buyer_id]]
+                if kept_cart.coupon_id is None:
+                    kept_cart.coupon_id = cart.coupon_id
+            Cart.objects.bulk_update(kept_carts.values(), ["coupon"])
+
+            # One item per listing, the kept cart's own first
+            survivors = {}
+            merged = set()
+            deleted = []
+            items = CartItem.objects.filter(cart_id__in=buyers).order_by("id")
+            for item in sorted(items, key=lambda item: item.cart_id not in kept_carts):
+                key = (buyers[item.cart_id], item.listing_id)
+                survivor = survivors.setdefault(key, item)
+                if survivor is not item:
+                    survivor.quantity += item.quantity
+                    merged.add(survivor.id)
+                    deleted.append(item.id)
+            for item in survivors.values():
+                item.cart_id = kept[buyers[item.cart_id]]
+
+            CartItem.objects.filter(id__in=deleted).delete()
+            CartItem.objects.bulk_update(survivors.values(), ["cart", "quantity"])
+            StockReservation.objects.filter(cart_item_id__in=merged).delete()
+
+            extra = [cart_id for cart_id in buyers if cart_id not in kept_carts]
+            Cart.objects.filter(id__in=extra).delete()
+            removed += len(extra)
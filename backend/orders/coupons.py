@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Coupon
+
+GENERATION_KEY = "orders:coupons:generation"
+
+# Per-process cache of resolved codes, unknown codes included
+MAX_ENTRIES = 4096
+ENTRY_TIMEOUT = 60 * 5
+
+_lock = threading.Lock()
+_entries = OrderedDict()
+_generation = None
+
+
+def _get_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def _bump_generation():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def invalidate_coupons():
+    """
+    Drop the resolved coupons of every process.
+
+    Processes notice through the generation in the shared cache, which is
+    bumped now and once the transaction commits like ``invalidate_listings``.
+    """
+    global _generation
+    with _lock:
+        _entries.clear()
+        # Lookups running now must not store what they read
+        _generation = None
+    _bump_generation()
+    transaction.on_commit(_bump_generation)
+
+
+def resolve_coupon(code):
+    """
+    Return the active coupon with ``code``, or ``None``.
+
+    Answers come from an LRU cache in the process, checked against the
+    shared generation, so repeated and unknown codes don't reach the
+    database. Misses are a single read of the unique ``code`` index. The
+    returned coupon is shared, don't modify it.
+    """
+    code = code.strip()
+    if not code or len(code) > Coupon._meta.get_field("code").max_length:
+        return None
+
+    global _generation
+    generation = _get_generation()
+    now = time.monotonic()
+    with _lock:
+        if generation != _generation:
+            _entries.clear()
+            _generation = generation
+
+        entry = _entries.get(code)
+        if entry is not None and entry[1] > now:
+            _entries.move_to_end(code)
+            return entry[0]
+
+    coupon = (
+        Coupon.objects.filter(code=code, active=True)
+        .only("id", "code", "discount", "active")
+        .first()
+    )
+
+    with _lock:
+        if generation == _generation:
+            _entries[code] = (coupon, now + ENTRY_TIMEOUT)
+            _entries.move_to_end(code)
+            while len(_entries) > MAX_ENTRIES:
+                _entries.popitem(last=False)
+
+    return coupon
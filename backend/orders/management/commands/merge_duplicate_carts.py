@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from orders.carts import MERGE_BATCH_SIZE, merge_duplicate_carts
+
+
+class Command(BaseCommand):
+    help = "Merge the extra carts of every user into their oldest cart"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=MERGE_BATCH_SIZE,
+            help="Number of users merged per batch",
+        )
+
+    def handle(self, *args, **options):
+        removed = merge_duplicate_carts(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"{removed} duplicate carts merged"))
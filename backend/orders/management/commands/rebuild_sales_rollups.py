@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+from orders.models import SellerDailySales, Transaction
+
+
+class Command(BaseCommand):
+    help = "Rebuild the seller daily sales rollups from the transactions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rollup rows inserted per batch",
+        )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        SellerDailySales.objects.all().delete()
+
+        rows = (
+            Transaction.objects.annotate(day=TruncDate("created"))
+            .values("seller_id", "listing_id", "day")
+            .annotate(
+                units=Sum("quantity"), revenue=Sum("total"), order_count=Count("id")
+            )
+            .order_by()
+        )
+
+        batch = []
+        rebuilt = 0
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(SellerDailySales(**row))
+            if len(batch) >= batch_size:
+                SellerDailySales.objects.bulk_create(batch)
+                rebuilt += len(batch)
+                batch = []
+
+        SellerDailySales.objects.bulk_create(batch)
+        rebuilt += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"{rebuilt} sales rollup rows rebuilt"))
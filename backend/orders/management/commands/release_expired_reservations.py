@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from orders.reservations import SWEEP_BATCH_SIZE, release_expired
+
+
+class Command(BaseCommand):
+    help = "Release expired stock reservations of cart items"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=SWEEP_BATCH_SIZE,
+            help="Number of reservations deleted per batch",
+        )
+
+    def handle(self, *args, **options):
+        released = release_expired(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"{released} expired reservations released")
+        )
@@ -0,0 +1,41 @@
+# Generated by Django 5.0.8 on 2026-10-18 14:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def rename_duplicate_codes(apps, schema_editor):
+    # Keep the oldest coupon of each code, suffix the others with their ID
+    Coupon = apps.get_model("orders", "Coupon")
+    seen = set()
+    for coupon in Coupon.objects.order_by("id").only("id", "code"):
+        if coupon.code in seen:
+            coupon.code = f"{coupon.code}-{coupon.id}"
+            coupon.save(update_fields=["code"])
+        seen.add(coupon.code)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("orders", "0002_stock_reservation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cart",
+            name="coupon",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="carts",
+                to="orders.coupon",
+            ),
+        ),
+        migrations.RunPython(rename_duplicate_codes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="coupon",
+            name="code",
+            field=models.CharField(max_length=255, unique=True),
+        ),
+    ]
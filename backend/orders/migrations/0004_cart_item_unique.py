@@ -0,0 +1,34 @@
+# Generated by Django 5.0.8 on 2026-10-18 14:37
+
+from django.db import migrations, models
+
+
+def merge_duplicate_items(apps, schema_editor):
+    # Fold repeated listings of a cart into the oldest item
+    CartItem = apps.get_model("orders", "CartItem")
+    kept = {}
+    for item in CartItem.objects.order_by("id").iterator():
+        key = (item.cart_id, item.listing_id)
+        if key not in kept:
+            kept[key] = item
+            continue
+        kept[key].quantity += item.quantity
+        kept[key].save(update_fields=["quantity"])
+        item.delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("listings", "0007_listing_modified_idx"),
+        ("orders", "0003_coupon_code_unique"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_items, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="cartitem",
+            constraint=models.UniqueConstraint(
+                fields=("cart", "listing"), name="cart_item_cart_listing_unique"
+            ),
+        ),
+    ]
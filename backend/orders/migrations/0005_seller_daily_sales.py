@@ -0,0 +1,69 @@
+# Generated by Django 5.0.8 on 2026-10-18 14:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("listings", "0007_listing_modified_idx"),
+        ("orders", "0004_cart_item_unique"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SellerDailySales",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("modified", models.DateTimeField(auto_now=True)),
+                ("day", models.DateField()),
+                ("units", models.PositiveIntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("order_count", models.PositiveIntegerField(default=0)),
+                (
+                    "listing",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="listings.listing",
+                    ),
+                ),
+                (
+                    "seller",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_sales",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Seller daily sales",
+                "verbose_name_plural": "Seller daily sales",
+                "indexes": [
+                    models.Index(
+                        fields=["seller", "day"], name="seller_daily_sales_day_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="sellerdailysales",
+            constraint=models.UniqueConstraint(
+                fields=("seller", "listing", "day"), name="seller_daily_sales_unique"
+            ),
+        ),
+    ]
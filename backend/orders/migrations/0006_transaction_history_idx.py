@@ -0,0 +1,27 @@
+# Generated by Django 5.0.8 on 2026-10-18 14:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("listings", "0007_listing_modified_idx"),
+        ("orders", "0005_seller_daily_sales"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["buyer", "created", "id"], name="transaction_buyer_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["seller", "created", "id"], name="transaction_seller_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.0.8 on 2026-10-18 14:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+BATCH_SIZE = 500
+
+
+def merge_carts(apps, schema_editor):
+    # Fold every extra cart of a buyer into their oldest one. Items of the
+    # same listing are merged into one, the holds of merged items released.
+    # A frozen copy of orders.carts.merge_duplicate_carts, so later changes
+    # to the app code do not change what this migration does.
+    Cart = apps.get_model("orders", "Cart")
+    CartItem = apps.get_model("orders", "CartItem")
+    StockReservation = apps.get_model("orders", "StockReservation")
+
+    duplicated = (
+        Cart.objects.order_by("buyer_id")
+        .values("buyer_id")
+        .annotate(carts=Count("id"), kept=Min("id"))
+        .filter(carts__gt=1)
+    )
+    last_buyer = None
+    while True:
+        batch = duplicated
+        if last_buyer is not None:
+            batch = batch.filter(buyer_id__gt=last_buyer)
+        kept = {row["buyer_id"]: row["kept"] for row in batch[:BATCH_SIZE]}
+        if not kept:
+            return
+        last_buyer = max(kept)
+
+        carts = list(Cart.objects.filter(buyer_id__in=kept).order_by("id"))
+        buyers = {cart.id: cart.buyer_id for cart in carts}
+
+        # The kept cart takes the first coupon found
+        kept_carts = {cart.id: cart for cart in carts if cart.id in kept.values()}
+        for cart in carts:
+            kept_cart = kept_carts[kept[cart.buyer_id]]
+            if kept_cart.coupon_id is None:
+                kept_cart.coupon_id = cart.coupon_id
+        Cart.objects.bulk_update(kept_carts.values(), ["coupon"])
+
+        # One item per listing, the kept cart's own first
+        survivors = {}
+        merged = set()
+        deleted = []
+        items = CartItem.objects.filter(cart_id__in=buyers).order_by("id")
+        for item in sorted(items, key=lambda item: item.cart_id not in kept_carts):
+            key = (buyers[item.cart_id], item.listing_id)
+            survivor = survivors.setdefault(key, item)
+            if survivor is not item:
+                survivor.quantity += item.quantity
+                merged.add(survivor.id)
+                deleted.append(item.id)
+        for item in survivors.values():
+            item.cart_id = kept[buyers[item.cart_id]]
+
+        CartItem.objects.filter(id__in=deleted).delete()
+        CartItem.objects.bulk_update(survivors.values(), ["cart", "quantity"])
+        StockReservation.objects.filter(cart_item_id__in=merged).delete()
+
+        extra = [cart_id for cart_id in buyers if cart_id not in kept_carts]
+        Cart.objects.filter(id__in=extra).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("orders", "0006_transaction_history_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_carts, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="cart",
+            name="buyer",
+            field=models.OneToOneField(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="cart",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
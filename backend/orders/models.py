@@ -17,13 +17,60 @@ class Transaction(BaseModel):
     class Meta:
         verbose_name = "Transaction"
         verbose_name_plural = "Transactions"
+        indexes = [
+            # Back the keyset paginated purchase and sale histories
+            models.Index(
+                fields=["buyer", "created", "id"], name="transaction_buyer_idx"
+            ),
+            models.Index(
+                fields=["seller", "created", "id"], name="transaction_seller_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.buyer.email} bought {self.quantity} of {self.listing.title} from {self.seller.email}"
 
 
+class SellerDailySales(BaseModel):
+    # Transactions rolled up per seller, listing and day, see orders.rollups
+    seller = models.ForeignKey(
+        "users.User", on_delete=models.CASCADE, related_name="daily_sales"
+    )
+    listing = models.ForeignKey("listings.Listing", on_delete=models.CASCADE)
+    day = models.DateField()
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    order_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Seller daily sales"
+        verbose_name_plural = "Seller daily sales"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["seller", "listing", "day"],
+                name="seller_daily_sales_unique",
+            )
+        ]
+        indexes = [
+            # Date range reads of a seller's dashboard
+            models.Index(fields=["seller", "day"], name="seller_daily_sales_day_idx")
+        ]
+
+    def __str__(self):
+        return f"Sales of {self.listing_id} by {self.seller_id} on {self.day}"
+
+
 class Cart(BaseModel):
-    buyer = models.ForeignKey("users.User", on_delete=models.CASCADE)
+    buyer = models.OneToOneField(
+        "users.User", on_delete=models.CASCADE, related_name="cart"
+    )
+    coupon = models.ForeignKey(
+        "Coupon",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="carts",
+    )
 
     class Meta:
         verbose_name = "Order"
@@ -38,14 +85,48 @@ class CartItem(BaseModel):
     listing = models.ForeignKey("listings.Listing", on_delete=models.CASCADE)
     quantity = models.PositiveSmallIntegerField(default=1, null=False)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["cart", "listing"], name="cart_item_cart_listing_unique"
+            )
+        ]
+
     def __str__(self):
         return (
             f"{self.quantity} of {self.listing.title} in {self.cart.buyer.email}'s cart"
         )
 
 
+class StockReservation(BaseModel):
+    # Units of a listing held for a cart item until expires_at
+    cart_item = models.OneToOneField(
+        CartItem, on_delete=models.CASCADE, related_name="reservation"
+    )
+    listing = models.ForeignKey(
+        "listings.Listing", on_delete=models.CASCADE, related_name="reservations"
+    )
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Stock reservation"
+        verbose_name_plural = "Stock reservations"
+        indexes = [
+            # Sum of the live holds of a listing
+            models.Index(
+                fields=["listing", "expires_at"], name="reservation_listing_idx"
+            ),
+            # Sweeping expired holds
+            models.Index(fields=["expires_at"], name="reservation_expires_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} of {self.listing_id} held until {self.expires_at}"
+
+
 class Coupon(BaseModel):
-    code = models.CharField(max_length=255, null=False)
+    code = models.CharField(max_length=255, null=False, unique=True)
     discount = models.DecimalField(max_digits=10, decimal_places=2, null=False)
     active = models.BooleanField(default=True, null=False)
 
@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from listings.models import Listing
+
+from .models import StockReservation
+
+SWEEP_BATCH_SIZE = 1000
+
+
+def live_reservations():
+    return StockReservation.objects.filter(expires_at__gt=timezone.now())
+
+
+def get_reserved_quantities(listing_ids, exclude=None):
+    """
+    Units of each of ``listing_ids`` held by live reservations, in one
+    grouped query over the ``(listing, expires_at)`` index. ``exclude`` is a
+    queryset filter for holds that should not count, e.g. the caller's own.
+    """
+    reservations = live_reservations().filter(listing_id__in=listing_ids)
+    if exclude:
+        reservations = reservations.exclude(**exclude)
+    rows = (
+        reservations.order_by()
+        .values("listing_id")
+        .annotate(reserved=Sum("quantity"))
+        .values_list("listing_id", "reserved")
+    )
+    return dict(rows)
+
+
+def get_available_quantity(listing, cart_item=None):
+    # Stock minus live holds, the hold of cart_item itself excluded
+    exclude = {"cart_item": cart_item} if cart_item is not None else None
+    reserved = get_reserved_quantities([listing.id], exclude=exclude)
+    return listing.quantity - reserved.get(listing.id, 0)
+
+
+def get_expiry():
+    return timezone.now() + timedelta(seconds=settings.STOCK_RESERVATION_TTL)
+
+
+def hold(cart_items):
+    # Upsert the holds of cart_items in one query, the stock must have been
+    # checked already
+    expires_at = get_expiry()
+    StockReservation.objects.bulk_create(
+        [
+            StockReservation(
+                cart_item=cart_item,
+                listing_id=cart_item.listing_id,
+                quantity=cart_item.quantity,
+                expires_at=expires_at,
+            )
+            for cart_item in cart_items
+        ],
+        update_conflicts=True,
+        unique_fields=["cart_item"],
+        update_fields=["listing", "quantity", "expires_at", "modified"],
+    )
+
+
+@transaction.atomic
+def reserve(cart_item):
+    """
+    Hold the units of ``cart_item`` for ``STOCK_RESERVATION_TTL`` seconds.
+
+    The listing row is locked while the holds are counted, so concurrent
+    carts cannot reserve the same last unit.
+    """
+    listing = Listing.objects.select_for_update().get(pk=cart_item.listing_id)
+    if cart_item.quantity > get_available_quantity(listing, cart_item):
+        raise ValidationError("Quantity is greater than the available quantity")
+
+    hold([cart_item])
+
+
+def release_expired(batch_size=SWEEP_BATCH_SIZE):
+    """
+    Delete expired reservations ``batch_size`` rows at a time, so the sweep
+    never holds long locks. Returns the number of reservations released.
+    """
+    released = 0
+    now = timezone.now()
+    expired = StockReservation.objects.filter(expires_at__lte=now).order_by(
+        "expires_at"
+    )
+    while True:
+        ids = list(expired.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return released
+        released += StockReservation.objects.filter(id__in=ids).delete()[0]
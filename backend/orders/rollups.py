@@ -0,0 +1,115 @@
+from collections import defaultdict
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.db.models import Case, DecimalField, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import SellerDailySales
+
+# (model field, output field) of the rolled up amounts
+ROLLUP_FIELDS = {
+    "units": IntegerField(),
+    "revenue": DecimalField(max_digits=14, decimal_places=2),
+    "order_count": IntegerField(),
+}
+
+
+def _key_filter(seller_id, listing_id, day):
+    return Q(seller_id=seller_id, listing_id=listing_id, day=day)
+
+
+def record_sales_rollup(transactions, sign=1):
+    """
+    Add ``transactions`` to the daily sales rollups, or take them off with
+    ``sign=-1``.
+
+    Missing rows are created with ``bulk_create(ignore_conflicts=True)``
+    and every row is then updated with one ``Case`` UPDATE, so the cost
+    does not depend on how many transactions are rolled up.
+    """
+    deltas = defaultdict(lambda: {"units": 0, "revenue": Decimal(0), "order_count": 0})
+    for item in transactions:
+        day = timezone.localdate(item.created)
+        delta = deltas[(item.seller_id, item.listing_id, day)]
+        delta["units"] += sign * item.quantity
+        delta["revenue"] += sign * item.total
+        delta["order_count"] += sign
+    if not deltas:
+        return
+
+    if sign > 0:
+        SellerDailySales.objects.bulk_create(
+            [
+                SellerDailySales(seller_id=seller_id, listing_id=listing_id, day=day)
+                for seller_id, listing_id, day in deltas
+            ],
+            ignore_conflicts=True,
+        )
+
+    updates = {
+        field: Greatest(
+            F(field)
+            + Case(
+                *[
+                    When(_key_filter(*key), then=Value(delta[field]))
+                    for key, delta in deltas.items()
+                ],
+                default=Value(0),
+                output_field=output_field,
+            ),
+            Value(0),
+            output_field=output_field,
+        )
+        for field, output_field in ROLLUP_FIELDS.items()
+    }
+    SellerDailySales.objects.filter(
+        reduce(or_, (_key_filter(*key) for key in deltas))
+    ).update(modified=timezone.now(), **updates)
+
+
+def _totals(row):
+    return {
+        "units": row["total_units"] or 0,
+        "revenue": row["total_revenue"] or Decimal("0.00"),
+        "orders": row["total_orders"] or 0,
+    }
+
+
+def get_sales_analytics(seller, start, end):
+    """
+    Units, revenue and order count of ``seller`` between the ``start`` and
+    ``end`` dates (inclusive): the totals, per day and per listing. Read from
+    the rollups over the ``(seller, day)`` index.
+    """
+    rows = SellerDailySales.objects.filter(
+        seller=seller, day__gte=start, day__lte=end
+    ).order_by()
+    sums = {
+        "total_units": Sum("units"),
+        "total_revenue": Sum("revenue"),
+        "total_orders": Sum("order_count"),
+    }
+
+    days = rows.values("day").annotate(**sums).order_by("day")
+    listings = (
+        rows.values("listing_id", "listing__title")
+        .annotate(**sums)
+        .order_by("-total_revenue", "listing_id")
+    )
+    return {
+        "start": start,
+        "end": end,
+        "totals": _totals(rows.aggregate(**sums)),
+        "days": [{"day": row["day"], **_totals(row)} for row in days],
+        "listings": [
+            {
+                "listing": row["listing_id"],
+                "title": row["listing__title"],
+                **_totals(row),
+            }
+            for row in listings
+        ],
+    }
@@ -1,6 +1,11 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 
 from .models import Cart, CartItem, Coupon, Transaction
+from .reservations import get_available_quantity, reserve
 
 
 class TransactionSerializer(serializers.ModelSerializer):
@@ -9,6 +14,10 @@ class TransactionSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class TransactionHistorySerializer(TransactionSerializer):
+    listing_title = serializers.CharField(source="listing.title", read_only=True)
+
+
 class CartSerializer(serializers.ModelSerializer):
     class Meta:
         model = Cart
@@ -28,9 +37,10 @@ class CartItemSerializer(serializers.ModelSerializer):
         # If this is an update operation, get the existing instance
         instance = getattr(self, "instance", None)
 
-        # Check the quantity of the listing
+        # Check the quantity of the listing, units held by other carts
+        # are not available
         if quantity is not None:
-            if quantity > listing.quantity:
+            if quantity > get_available_quantity(listing, instance):
                 raise serializers.ValidationError(
                     "Quantity is greater than the available quantity"
                 )
@@ -41,13 +51,6 @@ class CartItemSerializer(serializers.ModelSerializer):
         if not cart:
             raise serializers.ValidationError("Cart does not exist")
 
-        # Check if the item already exists in the cart (only for create operations)
-        if (
-            not instance
-            and CartItem.objects.filter(cart=cart, listing=listing).exists()
-        ):
-            raise serializers.ValidationError("Item already exists in cart")
-
         # Check if the cart belongs to the user
         if cart and cart.buyer != self.context["request"].user:
             raise serializers.ValidationError("Cart does not belong to the user")
@@ -60,15 +63,108 @@ class CartItemSerializer(serializers.ModelSerializer):
 
         return attrs
 
-    def create(self, validated_data):
-        return CartItem.objects.create(**validated_data)
-
+    @transaction.atomic
     def update(self, instance, validated_data):
         instance.quantity = validated_data.get("quantity", instance.quantity)
         instance.save()
+        reserve(instance)
         return instance
 
 
+class CartItemAddSerializer(serializers.Serializer):
+    cart = serializers.IntegerField()
+    listing = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1, max_value=32767, default=1)
+
+
+class CartOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=["add", "set", "remove"])
+    listing = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=0, max_value=32767, required=False)
+
+    def validate(self, attrs):
+        if attrs["op"] == "add":
+            attrs.setdefault("quantity", 1)
+            if attrs["quantity"] < 1:
+                raise serializers.ValidationError("Quantity cannot be less than 1")
+        elif attrs["op"] == "set" and "quantity" not in attrs:
+            raise serializers.ValidationError("Quantity is required")
+        return attrs
+
+
+class CartBatchSerializer(serializers.Serializer):
+    operations = CartOperationSerializer(many=True, allow_empty=False, max_length=100)
+
+
+class CartSummaryListingSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    stock = serializers.IntegerField()
+    active = serializers.BooleanField()
+
+
+class CartSummaryItemSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    listing = CartSummaryListingSerializer()
+    quantity = serializers.IntegerField()
+    line_total = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class CartSummarySerializer(serializers.Serializer):
+    cart = serializers.IntegerField()
+    coupon = serializers.CharField(allow_null=True)
+    items = CartSummaryItemSerializer(many=True)
+    units = serializers.IntegerField()
+    subtotal = serializers.DecimalField(max_digits=12, decimal_places=2)
+    discount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class SalesAnalyticsQuerySerializer(serializers.Serializer):
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    # Longest range answered in one request, in days
+    max_days = 366 * 5
+
+    def validate(self, attrs):
+        end = attrs.get("end") or timezone.localdate()
+        start = attrs.get("start") or end - timedelta(days=29)
+        if start > end:
+            raise serializers.ValidationError("start cannot be after end")
+        if (end - start).days >= self.max_days:
+            raise serializers.ValidationError("Date range is too long")
+        return {"start": start, "end": end}
+
+
+class SalesTotalsSerializer(serializers.Serializer):
+    units = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    orders = serializers.IntegerField()
+
+
+class SalesDaySerializer(SalesTotalsSerializer):
+    day = serializers.DateField()
+
+
+class SalesListingSerializer(SalesTotalsSerializer):
+    listing = serializers.IntegerField()
+    title = serializers.CharField()
+
+
+class SalesAnalyticsSerializer(serializers.Serializer):
+    start = serializers.DateField()
+    end = serializers.DateField()
+    totals = SalesTotalsSerializer()
+    days = SalesDaySerializer(many=True)
+    listings = SalesListingSerializer(many=True)
+
+
+class CouponApplySerializer(serializers.Serializer):
+    code = serializers.CharField(max_length=255)
+
+
 class CouponSerializer(serializers.ModelSerializer):
     class Meta:
         model = Coupon
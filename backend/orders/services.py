@@ -0,0 +1,389 @@
+from collections import Counter
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import (
+    Case,
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+    Window,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from core.outbox import publish
+from listings.cache import invalidate_listings
+from listings.models import Listing
+from listings.stats import record_sales
+
+from .models import Cart, CartItem, Transaction
+from .reservations import get_reserved_quantities, hold, live_reservations
+from .rollups import record_sales_rollup
+
+TRANSACTION_CREATED = "transaction.created"
+
+
+def get_discount(coupon, subtotal):
+    # Coupons take a fixed amount off, never more than the subtotal
+    if coupon is None or not coupon.active:
+        return Decimal("0.00")
+    return min(coupon.discount, subtotal)
+
+
+@transaction.atomic
+def add_to_cart(user, cart_id, listing_id, quantity):
+    """
+    Add ``quantity`` units of a listing to a cart of ``user``, or to the
+    item already holding it, and hold the units. Returns the item and
+    whether it was created.
+
+    The listing is locked first, like in ``reservations.reserve`` and
+    ``apply_cart_operations``, so concurrent adds of it wait for this one.
+    The item and the stock held by other carts are read once the lock is
+    granted, and the item is upserted on the ``(cart, listing)`` constraint.
+    """
+    listing = (
+        Listing.objects.select_for_update(of=("self",))
+        .filter(id=listing_id)
+        .annotate(
+            cart_buyer=Subquery(Cart.objects.filter(id=cart_id).values("buyer_id")[:1])
+        )
+        .values("active", "quantity", "cart_buyer")
+        .first()
+    )
+
+    if listing is None:
+        raise ValidationError("Listing does not exist")
+    if listing["cart_buyer"] is None:
+        raise ValidationError("Cart does not exist")
+    if listing["cart_buyer"] != user.id:
+        raise ValidationError("Cart does not belong to the user")
+    if not listing["active"]:
+        raise ValidationError("Listing is not active")
+
+    # A new statement, so it sees what the holders of the lock committed
+    in_cart = CartItem.objects.filter(cart_id=cart_id, listing=OuterRef("pk"))
+    reserved = (
+        live_reservations()
+        .filter(listing=OuterRef("pk"))
+        .exclude(cart_item__cart_id=cart_id)
+        .order_by()
+        .values("listing")
+        .annotate(total=Sum("quantity"))
+        .values("total")
+    )
+    held = (
+        Listing.objects.filter(id=listing_id)
+        .annotate(
+            in_cart_id=Subquery(in_cart.values("id")[:1]),
+            in_cart=Coalesce(Subquery(in_cart.values("quantity")[:1]), 0),
+            reserved=Coalesce(Subquery(reserved), 0),
+        )
+        .values("in_cart_id", "in_cart", "reserved")
+        .get()
+    )
+
+    total = held["in_cart"] + quantity
+    if total > listing["quantity"] - held["reserved"]:
+        raise ValidationError("Quantity is greater than the available quantity")
+
+    cart_item = CartItem.objects.bulk_create(
+        [CartItem(cart_id=cart_id, listing_id=listing_id, quantity=total)],
+        update_conflicts=True,
+        unique_fields=["cart", "listing"],
+        update_fields=["quantity", "modified"],
+    )[0]
+    created = cart_item.id != held["in_cart_id"]
+    if not created:
+        # The upserted instance carries the creation time of the insert
+        cart_item = CartItem.objects.get(id=cart_item.id)
+    hold([cart_item])
+    return cart_item, created
+
+
+def fold_cart_operations(quantities, operations):
+    """
+    Apply ``operations`` to ``quantities``, a ``{listing id: units}`` dict
+    of the cart, in place. Returns ``{listing id: index}`` of the last
+    operation touching each listing.
+    """
+    touched = {}
+    for index, operation in enumerate(operations):
+        listing_id = operation["listing"]
+        if operation["op"] == "add":
+            quantities[listing_id] = (
+                quantities.get(listing_id, 0) + operation["quantity"]
+            )
+        elif operation["op"] == "set":
+            quantities[listing_id] = operation["quantity"]
+        else:
+            quantities[listing_id] = 0
+        touched[listing_id] = index
+    return touched
+
+
+def get_operation_errors(touched, quantities, listings, reserved):
+    # {operation index: message} of the listings that cannot take their units
+    errors = {}
+    for listing_id, index in touched.items():
+        units = quantities[listing_id]
+        listing = listings.get(listing_id)
+        if units == 0:
+            continue
+        if listing is None:
+            errors[index] = "Listing does not exist"
+        elif not listing.active:
+            errors[index] = "Listing is not active"
+        elif units > listing.quantity - reserved.get(listing_id, 0):
+            errors[index] = "Quantity is greater than the available quantity"
+    return errors
+
+
+@transaction.atomic
+def apply_cart_operations(cart, operations):
+    """
+    Apply a list of ``{"op", "listing", "quantity"}`` operations to ``cart``
+    in one transaction. ``add`` adds units, ``set`` sets the quantity (0
+    removes the item) and ``remove`` removes the item.
+
+    The listings are loaded with one ``in_bulk`` and the changes written with
+    one ``bulk_create``, one ``bulk_update`` and one delete. Nothing is
+    written if any operation fails.
+    """
+    cart = (
+        Cart.objects.select_for_update(of=("self",))
+        .select_related("coupon")
+        .get(pk=cart.pk)
+    )
+    items = {item.listing_id: item for item in CartItem.objects.filter(cart=cart)}
+    quantities = {listing_id: item.quantity for listing_id, item in items.items()}
+    touched = fold_cart_operations(quantities, operations)
+
+    # Locked in ID order, like at checkout
+    listings = (
+        Listing.objects.select_for_update(of=("self",))
+        .order_by("id")
+        .only("id", "quantity", "active")
+        .in_bulk(touched)
+    )
+    reserved = get_reserved_quantities(touched, exclude={"cart_item__cart": cart})
+    errors = get_operation_errors(touched, quantities, listings, reserved)
+    if errors:
+        raise ValidationError({"operations": errors})
+
+    now = timezone.now()
+    created, updated, removed = [], [], []
+    for listing_id in touched:
+        units = quantities[listing_id]
+        item = items.get(listing_id)
+        if item is None:
+            if units:
+                created.append(
+                    CartItem(cart=cart, listing_id=listing_id, quantity=units)
+                )
+        elif not units:
+            removed.append(item.id)
+        elif units != item.quantity:
+            item.quantity = units
+            item.modified = now
+            updated.append(item)
+
+    created = CartItem.objects.bulk_create(created)
+    CartItem.objects.bulk_update(updated, ["quantity", "modified"])
+    if removed:
+        CartItem.objects.filter(id__in=removed).delete()
+    hold(created + updated)
+
+    return cart
+
+
+def record_transactions(transactions):
+    # Side effects of new transactions that bulk writes skip the signals for
+    quantities = Counter()
+    for item in transactions:
+        quantities[item.listing_id] += item.quantity
+    record_sales(quantities)
+    record_sales_rollup(transactions)
+    publish_transactions(transactions)
+    invalidate_listings()
+
+
+def publish_transactions(transactions):
+    # Outbox events of new transactions, written in the caller's transaction
+    publish(
+        TRANSACTION_CREATED,
+        [
+            {
+                "id": item.id,
+                "buyer": item.buyer_id,
+                "seller": item.seller_id,
+                "listing": item.listing_id,
+                "quantity": item.quantity,
+                "total": item.total,
+                "created": item.created,
+            }
+            for item in transactions
+        ],
+    )
+
+
+def decrement_stock(quantities):
+    """
+    Take ``quantities``, a ``{listing_id: units}`` mapping, off the stock of
+    the listings with a single UPDATE. The rows must be locked by the caller.
+    """
+    Listing.objects.filter(id__in=quantities).update(
+        quantity=F("quantity")
+        - Case(
+            *[
+                When(id=listing_id, then=Value(units))
+                for listing_id, units in quantities.items()
+            ],
+            default=Value(0),
+            output_field=IntegerField(),
+        ),
+        modified=timezone.now(),
+    )
+
+
+@transaction.atomic
+def checkout(cart):
+    """
+    Turn the items of ``cart`` into transactions and empty it.
+
+    The cart and its listings are locked, the listings in ID order so
+    concurrent checkouts cannot deadlock, and every step is a single query
+    whatever the number of items. Units held by other carts are not for sale,
+    the holds of this cart go away with its items. The discount of the
+    cart's coupon is applied and the coupon is used up.
+    """
+    cart = (
+        Cart.objects.select_for_update(of=("self",))
+        .select_related("coupon")
+        .get(pk=cart.pk)
+    )
+
+    quantities = Counter()
+    for listing_id, quantity in CartItem.objects.filter(cart=cart).values_list(
+        "listing_id", "quantity"
+    ):
+        quantities[listing_id] += quantity
+    if not quantities:
+        raise ValidationError("Cart is empty")
+
+    listings = list(
+        Listing.objects.select_for_update()
+        .filter(id__in=quantities)
+        .order_by("id")
+        .only("id", "owner_id", "price", "quantity", "active")
+    )
+
+    # Counted once the listings are locked, the cart's own holds are what
+    # it is about to buy
+    reserved = get_reserved_quantities(quantities, exclude={"cart_item__cart": cart})
+
+    errors = {}
+    transactions = []
+    for listing in listings:
+        units = quantities[listing.id]
+        if not listing.active:
+            errors[listing.id] = "Listing is not active"
+        elif units > listing.quantity - reserved.get(listing.id, 0):
+            errors[listing.id] = "Quantity is greater than the available quantity"
+        transactions.append(
+            Transaction(
+                buyer_id=cart.buyer_id,
+                seller_id=listing.owner_id,
+                listing_id=listing.id,
+                quantity=units,
+                total=listing.price * units,
+            )
+        )
+    if errors:
+        raise ValidationError(errors)
+
+    # The coupon discount is taken off the transactions in order
+    discount = get_discount(cart.coupon, sum(item.total for item in transactions))
+    for item in transactions:
+        applied = min(discount, item.total)
+        item.total -= applied
+        discount -= applied
+
+    decrement_stock(quantities)
+    transactions = Transaction.objects.bulk_create(transactions)
+    CartItem.objects.filter(cart=cart).delete()
+    if cart.coupon_id is not None:
+        cart.coupon = None
+        cart.save(update_fields=["coupon", "modified"])
+    record_transactions(transactions)
+
+    return transactions
+
+
+def get_cart_summary(cart):
+    """
+    Line items of ``cart`` with their listing, subtotal, coupon discount and
+    total. Load the cart with its coupon.
+
+    The line totals and the cart subtotal come out of a single query, the
+    subtotal as a window sum over the joined cart item and listing rows.
+    """
+    line_total = ExpressionWrapper(
+        F("listing__price") * F("quantity"),
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    )
+    rows = list(
+        CartItem.objects.filter(cart=cart)
+        .order_by("id")
+        .annotate(
+            line_total=line_total,
+            subtotal=Window(Sum(line_total)),
+            units=Window(Sum("quantity")),
+        )
+        .values(
+            "id",
+            "quantity",
+            "line_total",
+            "subtotal",
+            "units",
+            "listing_id",
+            "listing__title",
+            "listing__price",
+            "listing__quantity",
+            "listing__active",
+        )
+    )
+
+    subtotal = rows[0]["subtotal"] if rows else Decimal("0.00")
+    discount = get_discount(cart.coupon, subtotal)
+    return {
+        "cart": cart.id,
+        "coupon": cart.coupon.code if discount else None,
+        "items": [
+            {
+                "id": row["id"],
+                "listing": {
+                    "id": row["listing_id"],
+                    "title": row["listing__title"],
+                    "price": row["listing__price"],
+                    "stock": row["listing__quantity"],
+                    "active": row["listing__active"],
+                },
+                "quantity": row["quantity"],
+                "line_total": row["line_total"],
+            }
+            for row in rows
+        ],
+        "units": rows[0]["units"] if rows else 0,
+        "subtotal": subtotal,
+        "discount": discount,
+        "total": max(subtotal - discount, Decimal("0.00")),
+    }
@@ -0,0 +1,62 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .coupons import invalidate_coupons
+from .models import Coupon, Transaction
+from .rollups import record_sales_rollup
+from .services import publish_transactions
+
+
+@receiver(post_save, sender=Coupon)
+@receiver(post_delete, sender=Coupon)
+def invalidate_coupon_cache(sender, **kwargs):
+    invalidate_coupons()
+
+
+# Fields of a transaction the rollups are built from
+ROLLUP_SOURCE_FIELDS = ("seller", "listing", "quantity", "total", "created")
+
+
+def _rollup_values(instance):
+    return [
+        getattr(instance, Transaction._meta.get_field(name).attname)
+        for name in ROLLUP_SOURCE_FIELDS
+    ]
+
+
+@receiver(pre_save, sender=Transaction)
+def load_rolled_up_sale(sender, instance, update_fields=None, **kwargs):
+    # Keep the stored row of an update, roll_up_sale takes it off again
+    instance._rolled_up = None
+    if instance.pk is None:
+        return
+    if update_fields is not None and not {
+        Transaction._meta.get_field(name).name for name in update_fields
+    } & set(ROLLUP_SOURCE_FIELDS):
+        return
+    instance._rolled_up = (
+        Transaction.objects.filter(pk=instance.pk).only(*ROLLUP_SOURCE_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=Transaction)
+def roll_up_sale(sender, instance, created, **kwargs):
+    if created:
+        record_sales_rollup([instance])
+        return
+
+    old = getattr(instance, "_rolled_up", None)
+    if old is not None and _rollup_values(old) != _rollup_values(instance):
+        record_sales_rollup([old], sign=-1)
+        record_sales_rollup([instance])
+
+
+@receiver(post_save, sender=Transaction)
+def publish_sale(sender, instance, created, **kwargs):
+    if created:
+        publish_transactions([instance])
+
+
+@receiver(post_delete, sender=Transaction)
+def roll_up_deleted_sale(sender, instance, **kwargs):
+    record_sales_rollup([instance], sign=-1)
@@ -0,0 +1,167 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from conftest import User
+from listings.models import Listing, ListingStats
+from orders.models import CartItem, Transaction
+
+
+def create_listings(owner, category, count, quantity=5):
+    return [
+        Listing.objects.create(
+            title=f"Listing {i}",
+            image="listing_images/test.jpg",
+            description="Test Description",
+            price=10 + i,
+            quantity=quantity,
+            owner_id=owner.id,
+            category=category,
+        )
+        for i in range(count)
+    ]
+
+
+class TestCheckout:
+    @pytest.mark.django_db
+    def test_checkout(self, user_fixture, cart_fixture, category_fixture):
+        seller = User.objects.create_user(email="seller@example.com", password="test")
+        listings = create_listings(seller, category_fixture, 2)
+        CartItem.objects.create(cart=cart_fixture, listing=listings[0], quantity=2)
+        CartItem.objects.create(cart=cart_fixture, listing=listings[1], quantity=5)
+
+        client = APIClient()
+        client.force_authenticate(user_fixture)
+        checkout_url = reverse("cart-checkout", args=[cart_fixture.id])
+        response = client.post(checkout_url)
+        assert response.status_code == 201
+        assert len(response.data) == 2
+
+        transaction = Transaction.objects.get(listing=listings[0])
+        assert transaction.buyer == user_fixture
+        assert transaction.seller == seller
+        assert transaction.quantity == 2
+        assert transaction.total == 20
+        assert Transaction.objects.get(listing=listings[1]).total == 55
+
+        assert Listing.objects.get(id=listings[0].id).quantity == 3
+        assert Listing.objects.get(id=listings[1].id).quantity == 0
+        assert ListingStats.objects.get(listing=listings[0]).units_sold == 2
+        assert not CartItem.objects.filter(cart=cart_fixture).exists()
+
+        # Nothing left to buy
+        assert client.post(checkout_url).status_code == 400
+
+    @pytest.mark.django_db
+    def test_checkout_rejects_unavailable_items(
+        self, user_fixture, cart_fixture, category_fixture
+    ):
+        listings = create_listings(user_fixture, category_fixture, 2, quantity=1)
+        CartItem.objects.create(cart=cart_fixture, listing=listings[0], quantity=1)
+        CartItem.objects.create(cart=cart_fixture, listing=listings[1], quantity=1)
+        Listing.objects.filter(id=listings[1].id).update(quantity=0)
+
+        client = APIClient()
+        checkout_url = reverse("cart-checkout", args=[cart_fixture.id])
+        client.force_authenticate(
+            User.objects.create_user(email="other@example.com", password="test")
+        )
+        assert client.post(checkout_url).status_code == 403
+
+        client.force_authenticate(user_fixture)
+        assert client.post(checkout_url).status_code == 400
+
+        # The whole checkout is rolled back
+        assert Listing.objects.get(id=listings[0].id).quantity == 1
+        assert Transaction.objects.count() == 0
+        assert CartItem.objects.filter(cart=cart_fixture).count() == 2
+
+    @pytest.mark.django_db
+    def test_checkout_query_count(self, user_fixture, cart_fixture, category_fixture):
+        client = APIClient()
+        client.force_authenticate(user_fixture)
+        checkout_url = reverse("cart-checkout", args=[cart_fixture.id])
+
+        def count_queries(item_count):
+            for listing in create_listings(user_fixture, category_fixture, item_count):
+                CartItem.objects.create(cart=cart_fixture, listing=listing)
+            with CaptureQueriesContext(connection) as captured:
+                assert client.post(checkout_url).status_code == 201
+            return len(captured.captured_queries)
+
+        assert count_queries(2) == count_queries(10)
+
+
+class TestCartSummary:
+    @pytest.mark.django_db
+    def test_cart_summary(
+        self, user_fixture, cart_fixture, category_fixture, django_assert_num_queries
+    ):
+        listings = create_listings(user_fixture, category_fixture, 2)
+        CartItem.objects.create(cart=cart_fixture, listing=listings[0], quantity=2)
+        CartItem.objects.create(cart=cart_fixture, listing=listings[1], quantity=3)
+
+        client = APIClient()
+        client.force_authenticate(user_fixture)
+        summary_url = reverse("cart-summary", args=[cart_fixture.id])
+
+        # The cart, then the line items and totals in one query
+        with django_assert_num_queries(2):
+            response = client.get(summary_url)
+        assert response.status_code == 200
+        assert response.data["units"] == 5
+        assert response.data["subtotal"] == "53.00"
+        assert response.data["total"] == "53.00"
+
+        item = response.data["items"][0]
+        assert item["quantity"] == 2
+        assert item["line_total"] == "20.00"
+        assert item["listing"]["title"] == "Listing 0"
+        assert item["listing"]["stock"] == 5
+
+        CartItem.objects.filter(cart=cart_fixture).delete()
+        response = client.get(summary_url)
+        assert response.data["items"] == []
+        assert response.data["total"] == "0.00"
+
+
+class TestCartBatch:
+    @pytest.mark.django_db
+    def test_cart_batch_operations(self, user_fixture, cart_fixture, category_fixture):
+        listings = create_listings(user_fixture, category_fixture, 4)
+        kept, changed, removed, added = listings
+        CartItem.objects.create(cart=cart_fixture, listing=kept, quantity=1)
+        CartItem.objects.create(cart=cart_fixture, listing=changed, quantity=1)
+        CartItem.objects.create(cart=cart_fixture, listing=removed, quantity=1)
+
+        client = APIClient()
+        client.force_authenticate(user_fixture)
+        batch_url = reverse("cart-batch", args=[cart_fixture.id])
+        operations = [
+            {"op": "set", "listing": changed.id, "quantity": 3},
+            {"op": "remove", "listing": removed.id},
+            {"op": "add", "listing": added.id, "quantity": 2},
+            {"op": "add", "listing": added.id},
+        ]
+        response = client.post(batch_url, {"operations": operations}, format="json")
+        assert response.status_code == 200
+        assert response.data["units"] == 7
+
+        quantities = dict(
+            CartItem.objects.filter(cart=cart_fixture).values_list(
+                "listing_id", "quantity"
+            )
+        )
+        assert quantities == {kept.id: 1, changed.id: 3, added.id: 3}
+        assert CartItem.objects.get(listing=added).reservation.quantity == 3
+
+        # One failing operation leaves the cart as it was
+        operations = [
+            {"op": "remove", "listing": kept.id},
+            {"op": "set", "listing": changed.id, "quantity": 6},
+        ]
+        response = client.post(batch_url, {"operations": operations}, format="json")
+        assert response.status_code == 400
+        assert CartItem.objects.filter(cart=cart_fixture).count() == 3
@@ -0,0 +1,58 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from orders.coupons import resolve_coupon
+from orders.models import Cart, CartItem, Coupon, Transaction
+
+
+class TestCoupons:
+    @pytest.mark.django_db
+    def test_resolve_coupon_is_cached(self, django_assert_num_queries):
+        coupon = Coupon.objects.create(code="SAVE10", discount=10)
+
+        with django_assert_num_queries(1):
+            assert resolve_coupon("SAVE10") == coupon
+            assert resolve_coupon(" SAVE10 ") == coupon
+
+        # Unknown codes are cached as well
+        with django_assert_num_queries(1):
+            assert resolve_coupon("GUESS") is None
+            assert resolve_coupon("GUESS") is None
+
+        # Writes drop the cached answers
+        coupon.active = False
+        coupon.save()
+        assert resolve_coupon("SAVE10") is None
+        Coupon.objects.create(code="GUESS", discount=5)
+        assert resolve_coupon("GUESS").discount == 5
+
+    @pytest.mark.django_db
+    def test_apply_coupon_to_cart(self, user_fixture, cart_fixture, listing_fixture):
+        Coupon.objects.create(code="SAVE10", discount=10)
+        CartItem.objects.create(cart=cart_fixture, listing=listing_fixture, quantity=2)
+
+        client = APIClient()
+        client.force_authenticate(user_fixture)
+        coupon_url = reverse("cart-coupon", args=[cart_fixture.id])
+
+        response = client.post(coupon_url, {"code": "WRONG"})
+        assert response.status_code == 400
+
+        response = client.post(coupon_url, {"code": "SAVE10"})
+        assert response.status_code == 200
+        assert response.data["coupon"] == "SAVE10"
+        assert response.data["subtotal"] == "200.00"
+        assert response.data["discount"] == "10.00"
+        assert response.data["total"] == "190.00"
+
+        response = client.delete(coupon_url)
+        assert response.data["coupon"] is None
+        assert response.data["total"] == "200.00"
+
+        # The discount is taken off at checkout and the coupon used up
+        client.post(coupon_url, {"code": "SAVE10"})
+        response = client.post(reverse("cart-checkout", args=[cart_fixture.id]))
+        assert response.status_code == 201
+        assert Transaction.objects.get().total == 190
+        assert Cart.objects.get(id=cart_fixture.id).coupon is None
@@ -0,0 +1,122 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import idempotency
+from core.idempotency import purge_expired
+from core.models import IdempotencyKey
+from orders.models import CartItem, Transaction
+
+
+class TestIdempotencyKeys:
+    @pytest.mark.django_db
+    def test_retried_transaction_is_not_duplicated(self, user_fixture, listing_fixture):
+        client = APIClient()
+        client.force_authenticate(user_fixture)
+        transaction_url = reverse("transaction-list")
+        data = {
+            "buyer": user_fixture.id,
+            "seller": listing_fixture.owner_id,
+            "listing": listing_fixture.id,
+            "quantity": 1,
+            "total": "100.00",
+        }
+
+        response = client.post(transaction_url, data, HTTP_IDEMPOTENCY_KEY="abc")
+        assert response.status_code == 201
+
+        retry = client.post(transaction_url, data, HTTP_IDEMPOTENCY_KEY="abc")
+        assert retry.status_code == 201
+        assert retry["Idempotent-Replayed"] == "true"
+        assert retry.data["id"] == response.data["id"]
+        assert Transaction.objects.count() == 1
+
+        # The same key cannot be reused for another request
+        data["quantity"] = 2
+        response = client.post(transaction_url, data, HTTP_IDEMPOTENCY_KEY="abc")
+        assert response.status_code == 422
+
+        # Requests without a key are not affected
+        assert client.post(transaction_url, data).status_code == 201
+        assert Transaction.objects.count() == 2
+
+    @pytest.mark.django_db
+    def test_retried_checkout(self, user_fixture, cart_fixture, listing_fixture):
+        CartItem.objects.create(cart=cart_fixture, listing=listing_fixture)
+        client = APIClient()
+        client.force_authenticate(user_fixture)
+        checkout_url = reverse("cart-checkout", args=[cart_fixture.id])
+
+        # Expired keys can be used again
+        IdempotencyKey.objects.create(
+            user=user_fixture,
+            key="checkout",
+            fingerprint="",
+            expires_at=timezone.now() - timedelta(seconds=1),
+        )
+        response = client.post(checkout_url, HTTP_IDEMPOTENCY_KEY="checkout")
+        assert response.status_code == 201
+
+        retry = client.post(checkout_url, HTTP_IDEMPOTENCY_KEY="checkout")
+        assert retry.status_code == 201
+        assert retry.data == response.data
+        assert Transaction.objects.count() == 1
+
+        # An empty cart fails without storing the response
+        response = client.post(checkout_url, HTTP_IDEMPOTENCY_KEY="again")
+        assert response.status_code == 400
+        assert not IdempotencyKey.objects.filter(key="again").exists()
+
+    @pytest.mark.django_db
+    def test_failure_after_the_view_rolls_the_write_back(
+        self, monkeypatch, user_fixture, listing_fixture
+    ):
+        client = APIClient()
+        client.force_authenticate(user_fixture)
+        transaction_url = reverse("transaction-list")
+        data = {
+            "buyer": user_fixture.id,
+            "seller": listing_fixture.owner_id,
+            "listing": listing_fixture.id,
+            "quantity": 1,
+            "total": "100.00",
+        }
+
+        def crash(record, response):
+            raise RuntimeError("Worker died")
+
+        # The transaction and the key are committed together or not at all
+        monkeypatch.setattr(idempotency, "_store", crash)
+        with pytest.raises(RuntimeError):
+            client.post(transaction_url, data, HTTP_IDEMPOTENCY_KEY="crash")
+        assert not Transaction.objects.exists()
+        assert not IdempotencyKey.objects.exists()
+
+        monkeypatch.undo()
+        response = client.post(transaction_url, data, HTTP_IDEMPOTENCY_KEY="crash")
+        assert response.status_code == 201
+        assert Transaction.objects.count() == 1
+
+    @pytest.mark.django_db
+    def test_purge_expired_keys(self, user_fixture):
+        now = timezone.now()
+        for key, expires_at in [
+            ("old", now - timedelta(minutes=2)),
+            ("older", now - timedelta(minutes=1)),
+            ("live", now + timedelta(minutes=1)),
+        ]:
+            IdempotencyKey.objects.create(
+                user=user_fixture, key=key, fingerprint="", expires_at=expires_at
+            )
+
+        assert purge_expired(batch_size=1) == 2
+        assert list(IdempotencyKey.objects.values_list("key", flat=True)) == ["live"]
+
+        stdout = StringIO()
+        call_command("purge_idempotency_keys", stdout=stdout)
+        assert "0 expired idempotency keys deleted" in stdout.getvalue()
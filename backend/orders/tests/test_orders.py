@@ -64,14 +64,14 @@ class TestCart:
             owner_id=user.id,
         )
 
-        # Add the listing to the cart
+        # Add the listing to the cart without being logged in
         cart_item_url = reverse("cart-item-list")
         data = {"cart": cart_fixture.id, "listing": listing.id, "quantity": 1}
         response = client.post(
             cart_item_url,
             data,
         )
-        assert response.status_code == 400
+        assert response.status_code == 401
 
         # Try to add the same item to the cart
         client.force_authenticate(user_fixture)
@@ -149,3 +149,50 @@ class TestCart:
         data["quantity"] = 0
         response = client.put(cart_item_url, data)
         assert response.status_code == 400
+
+    @pytest.mark.django_db
+    def test_cart_conditional_get(self, user_fixture, cart_fixture):
+        client = APIClient()
+        client.force_authenticate(user_fixture)
+
+        cart_url = reverse("cart-detail", args=[cart_fixture.id])
+        etag = client.get(cart_url)["ETag"]
+        assert client.get(cart_url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        cart_list_url = reverse("cart-list")
+        etag = client.get(cart_list_url)["ETag"]
+        assert client.get(cart_list_url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    @pytest.mark.django_db
+    def test_add_item_twice_to_cart(
+        self, user_fixture, cart_fixture, listing_fixture, django_assert_num_queries
+    ):
+        client = APIClient()
+        client.force_authenticate(user_fixture)
+        cart_item_url = reverse("cart-item-list")
+        data = {"cart": cart_fixture.id, "listing": listing_fixture.id, "quantity": 2}
+
+        # Savepoint, the listing lock, the item and holds read after it, the
+        # item upsert, the stock hold and release
+        with django_assert_num_queries(6):
+            response = client.post(cart_item_url, data)
+        assert response.status_code == 201
+
+        # Adding it again adds to the same item
+        first = response.data
+        response = client.post(cart_item_url, data)
+        assert response.status_code == 200
+        cart_item = CartItem.objects.get(cart=cart_fixture, listing=listing_fixture)
+        assert response.data["id"] == first["id"] == cart_item.id
+        assert response.data["created"] == first["created"]
+        assert response.data["quantity"] == cart_item.quantity == 4
+        assert cart_item.reservation.quantity == 4
+
+        data["quantity"] = 7
+        assert client.post(cart_item_url, data).status_code == 400
+
+        # Carts of other users are off limits
+        other = User.objects.create_user(email="other@example.com", password="test")
+        client.force_authenticate(other)
+        data["quantity"] = 1
+        assert client.post(cart_item_url, data).status_code == 400
@@ -0,0 +1,115 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from conftest import sell
+from core.models import OutboxEvent
+from core.outbox import FileSink, dispatch, prune, retry
+from orders.models import CartItem
+
+
+class FailingSink:
+    def deliver(self, events):
+        raise ConnectionError("Sink is down")
+
+
+class TestOutbox:
+    @pytest.mark.django_db
+    def test_transactions_write_outbox_events(
+        self, user_fixture, cart_fixture, listing_fixture, tmp_path
+    ):
+        sell(user_fixture, listing_fixture, 1, 100)
+        CartItem.objects.create(cart=cart_fixture, listing=listing_fixture, quantity=2)
+        client = APIClient()
+        client.force_authenticate(user_fixture)
+        client.post(reverse("cart-checkout", args=[cart_fixture.id]))
+
+        events = OutboxEvent.objects.order_by("id")
+        assert [event.topic for event in events] == ["transaction.created"] * 2
+        assert [event.payload["quantity"] for event in events] == [1, 2]
+        assert events[1].payload["total"] == "200.00"
+
+        path = tmp_path / "events.jsonl"
+        sinks = [{"class": "core.outbox.FileSink", "options": {"path": str(path)}}]
+        stdout = StringIO()
+        with override_settings(OUTBOX_SINKS=sinks):
+            call_command("dispatch_outbox", "--batch-size", "1", stdout=stdout)
+        assert "2 outbox events dispatched" in stdout.getvalue()
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line["id"] for line in lines] == [event.id for event in events]
+        assert not OutboxEvent.objects.filter(delivered_at__isnull=True).exists()
+
+    @pytest.mark.django_db
+    def test_failed_deliveries_are_retried(self):
+        OutboxEvent.objects.create(topic="test", payload={"value": 1})
+        sinks = {"down": FailingSink()}
+
+        assert dispatch(sinks) == 1
+        event = OutboxEvent.objects.get()
+        assert event.attempts == 1
+        assert event.delivered_at is None
+        assert event.last_error == "down: Sink is down"
+        assert event.available_at > timezone.now()
+
+        # Nothing is due until the backoff is over
+        assert dispatch(sinks) == 0
+        OutboxEvent.objects.update(available_at=timezone.now())
+        assert dispatch(sinks) == 1
+        assert OutboxEvent.objects.get().attempts == 2
+
+        # Delivered events are pruned after the retention
+        OutboxEvent.objects.update(delivered_at=timezone.now() - timedelta(days=30))
+        assert prune(batch_size=1) == 1
+        assert not OutboxEvent.objects.exists()
+
+    @pytest.mark.django_db
+    def test_failing_sink_does_not_redeliver_to_others(self, tmp_path):
+        event = OutboxEvent.objects.create(topic="test", payload={"value": 1})
+        path = tmp_path / "events.jsonl"
+        sinks = {"file": FileSink(str(path)), "down": FailingSink()}
+
+        assert dispatch(sinks) == 1
+        OutboxEvent.objects.update(available_at=timezone.now())
+        assert dispatch(sinks) == 1
+        event.refresh_from_db()
+        assert event.delivered_to == ["file"]
+        assert len(path.read_text().splitlines()) == 1
+
+        # Delivered once the failing sink catches up
+        sinks["down"] = FileSink(str(tmp_path / "other.jsonl"))
+        OutboxEvent.objects.update(available_at=timezone.now())
+        assert dispatch(sinks) == 1
+        event.refresh_from_db()
+        assert event.delivered_at is not None
+        assert len(path.read_text().splitlines()) == 1
+
+    @pytest.mark.django_db
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2)
+    def test_events_are_dead_lettered(self, caplog):
+        OutboxEvent.objects.create(topic="test", payload={"value": 1})
+        sinks = {"down": FailingSink()}
+
+        for _ in range(2):
+            OutboxEvent.objects.update(available_at=timezone.now())
+            assert dispatch(sinks) == 1
+        event = OutboxEvent.objects.get()
+        assert event.dead_at is not None
+        assert f"Outbox event {event.id} dead after 2 attempts" in caplog.text
+
+        # Dead events are left alone until retried
+        OutboxEvent.objects.update(available_at=timezone.now())
+        assert dispatch(sinks) == 0
+        assert retry(OutboxEvent.objects.all()) == 1
+        assert dispatch(sinks) == 1
+
+        # and pruned after their own retention
+        OutboxEvent.objects.update(dead_at=timezone.now() - timedelta(days=31))
+        assert prune() == 1
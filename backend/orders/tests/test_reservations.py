@@ -0,0 +1,89 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from conftest import User
+from orders.models import Cart, CartItem, StockReservation
+from orders.reservations import get_available_quantity, release_expired
+
+
+def add_to_cart(user, cart, listing, quantity=1):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client.post(
+        reverse("cart-item-list"),
+        {"cart": cart.id, "listing": listing.id, "quantity": quantity},
+    )
+
+
+class TestStockReservations:
+    @pytest.mark.django_db
+    def test_cart_items_hold_stock(self, user_fixture, cart_fixture, listing_fixture):
+        other = User.objects.create_user(email="other@example.com", password="test")
+        other_cart = Cart.objects.get(buyer=other)
+
+        response = add_to_cart(user_fixture, cart_fixture, listing_fixture, 8)
+        assert response.status_code == 201
+        reservation = StockReservation.objects.get(listing=listing_fixture)
+        assert reservation.quantity == 8
+        assert reservation.expires_at > timezone.now()
+        assert get_available_quantity(listing_fixture) == 2
+
+        # Only the units nobody holds are left for other carts
+        assert add_to_cart(other, other_cart, listing_fixture, 3).status_code == 400
+        assert add_to_cart(other, other_cart, listing_fixture, 2).status_code == 201
+        assert get_available_quantity(listing_fixture) == 0
+
+        # Expired holds give the stock back
+        StockReservation.objects.filter(cart_item__cart=cart_fixture).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        assert get_available_quantity(listing_fixture) == 8
+
+        # Buying is allowed against stock minus the holds of other carts
+        client = APIClient()
+        client.force_authenticate(user_fixture)
+        response = client.post(reverse("cart-checkout", args=[cart_fixture.id]))
+        assert response.status_code == 201
+        assert not StockReservation.objects.filter(
+            cart_item__cart=cart_fixture
+        ).exists()
+
+    @pytest.mark.django_db
+    def test_release_expired(self, user_fixture, cart_fixture, listing_fixture):
+        cart_item = CartItem.objects.create(cart=cart_fixture, listing=listing_fixture)
+        other = User.objects.create_user(email="other@example.com", password="test")
+        other_item = CartItem.objects.create(
+            cart=Cart.objects.get(buyer=other), listing=listing_fixture
+        )
+        now = timezone.now()
+        StockReservation.objects.bulk_create(
+            [
+                StockReservation(
+                    cart_item=cart_item,
+                    listing=listing_fixture,
+                    quantity=1,
+                    expires_at=now - timedelta(minutes=1),
+                ),
+                StockReservation(
+                    cart_item=other_item,
+                    listing=listing_fixture,
+                    quantity=1,
+                    expires_at=now + timedelta(minutes=1),
+                ),
+            ]
+        )
+
+        assert release_expired(batch_size=1) == 1
+        assert list(StockReservation.objects.values_list("cart_item", flat=True)) == [
+            other_item.id
+        ]
+
+        stdout = StringIO()
+        call_command("release_expired_reservations", stdout=stdout)
+        assert "0 expired reservations released" in stdout.getvalue()
@@ -0,0 +1,103 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from conftest import User, sell
+from orders.models import CartItem, SellerDailySales, Transaction
+
+
+class TestSalesRollups:
+    @pytest.mark.django_db
+    def test_rollups_follow_transactions(
+        self, user_fixture, cart_fixture, listing_fixture
+    ):
+        first = sell(user_fixture, listing_fixture, 2, 200)
+        sell(user_fixture, listing_fixture, 1, 100)
+
+        rollup = SellerDailySales.objects.get()
+        assert rollup.seller_id == listing_fixture.owner_id
+        assert rollup.day == timezone.localdate()
+        assert (rollup.units, rollup.revenue, rollup.order_count) == (3, 300, 2)
+
+        first.delete()
+        rollup.refresh_from_db()
+        assert (rollup.units, rollup.revenue, rollup.order_count) == (1, 100, 1)
+
+        # Edits move the sale between rollups
+        second = Transaction.objects.get()
+        second.quantity, second.total = 3, 300
+        second.save()
+        rollup.refresh_from_db()
+        assert (rollup.units, rollup.revenue, rollup.order_count) == (3, 300, 1)
+
+        other = User.objects.create_user(email="other@example.com", password="test")
+        second.seller = other
+        second.save(update_fields=["seller"])
+        rollup.refresh_from_db()
+        assert (rollup.units, rollup.revenue, rollup.order_count) == (0, 0, 0)
+        moved = SellerDailySales.objects.get(seller=other)
+        assert (moved.units, moved.revenue, moved.order_count) == (3, 300, 1)
+        second.seller_id = listing_fixture.owner_id
+        second.quantity, second.total = 1, 100
+        second.save()
+
+        # Checkouts write their transactions in bulk
+        CartItem.objects.create(cart=cart_fixture, listing=listing_fixture, quantity=4)
+        client = APIClient()
+        client.force_authenticate(user_fixture)
+        client.post(reverse("cart-checkout", args=[cart_fixture.id]))
+        rollup.refresh_from_db()
+        assert (rollup.units, rollup.revenue, rollup.order_count) == (5, 500, 2)
+
+        # The rebuild lands on the same numbers
+        SellerDailySales.objects.update(units=0, revenue=0, order_count=0)
+        stdout = StringIO()
+        call_command("rebuild_sales_rollups", stdout=stdout)
+        assert "1 sales rollup rows rebuilt" in stdout.getvalue()
+        rollup = SellerDailySales.objects.get()
+        assert (rollup.units, rollup.revenue, rollup.order_count) == (5, 500, 2)
+
+    @pytest.mark.django_db
+    def test_sales_analytics(
+        self, user_fixture, listing_fixture, django_assert_num_queries
+    ):
+        seller = User.objects.get(id=listing_fixture.owner_id)
+        sell(user_fixture, listing_fixture, 2, 200)
+        today = timezone.localdate()
+        SellerDailySales.objects.create(
+            seller=seller,
+            listing=listing_fixture,
+            day=today - timedelta(days=40),
+            units=7,
+            revenue=700,
+            order_count=3,
+        )
+
+        client = APIClient()
+        client.force_authenticate(seller)
+        analytics_url = reverse("transaction-analytics")
+
+        # Totals, days and listings, each from the rollups
+        with django_assert_num_queries(3):
+            response = client.get(analytics_url)
+        assert response.status_code == 200
+        assert response.data["totals"] == {"units": 2, "revenue": "200.00", "orders": 1}
+        assert [day["day"] for day in response.data["days"]] == [str(today)]
+        assert response.data["listings"][0]["title"] == "Test Listing"
+
+        start = str(today - timedelta(days=60))
+        response = client.get(analytics_url, {"start": start})
+        assert response.data["totals"]["units"] == 9
+        assert len(response.data["days"]) == 2
+
+        response = client.get(analytics_url, {"start": str(today), "end": start})
+        assert response.status_code == 400
+
+        # Buyers see no sales of their own
+        client.force_authenticate(user_fixture)
+        assert client.get(analytics_url).data["totals"]["orders"] == 0
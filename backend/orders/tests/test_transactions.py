@@ -0,0 +1,40 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from conftest import User, sell
+
+
+class TestTransactionHistory:
+    @pytest.mark.django_db
+    def test_purchase_and_sale_history(
+        self, user_fixture, listing_fixture, django_assert_num_queries
+    ):
+        for _ in range(3):
+            sell(user_fixture, listing_fixture, 1, 100)
+        seller = User.objects.get(id=listing_fixture.owner_id)
+
+        client = APIClient()
+        client.force_authenticate(user_fixture)
+        purchases_url = reverse("transaction-purchases")
+
+        # One query per page, the listings come with the transactions
+        with django_assert_num_queries(1):
+            response = client.get(purchases_url, {"page_size": 2})
+        assert response.status_code == 200
+        assert len(response.data["results"]) == 2
+        assert response.data["results"][0]["listing_title"] == "Test Listing"
+
+        response = client.get(response.data["next"])
+        assert len(response.data["results"]) == 1
+        assert response.data["next"] is None
+
+        assert client.get(reverse("transaction-sales")).data["results"] == []
+        client.force_authenticate(seller)
+        assert len(client.get(reverse("transaction-sales")).data["results"]) == 3
+
+        # Other users don't see the transactions
+        other = User.objects.create_user(email="other@example.com", password="test")
+        client.force_authenticate(other)
+        assert client.get(reverse("transaction-list")).data == []
+        assert client.get(purchases_url).data["results"] == []
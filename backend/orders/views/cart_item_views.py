@@ -4,11 +4,16 @@ from drf_spectacular.utils import (
     extend_schema,
     extend_schema_view,
 )
-from rest_framework import viewsets
+from rest_framework import status, viewsets
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
+from core.idempotency import idempotent
+from core.views import ConditionalGetMixin
+
+from .. import services
 from ..models import CartItem
-from ..permissions import IsNotItemAlreadyInCart
-from ..serializers import CartItemSerializer
+from ..serializers import CartItemAddSerializer, CartItemSerializer
 
 
 @extend_schema_view(
@@ -50,8 +55,11 @@ from ..serializers import CartItemSerializer
     ),
     create=extend_schema(
         summary="Create a new cart item",
-        description="Create a new cart item for a cart.",
-        request=CartItemSerializer,
+        description=(
+            "Add a listing to a cart. If the cart already holds the listing "
+            "its quantity is increased and the item is returned with 200."
+        ),
+        request=CartItemAddSerializer,
         responses={
             201: OpenApiResponse(
                 response=CartItemSerializer,
@@ -70,6 +78,10 @@ from ..serializers import CartItemSerializer
                     )
                 ],
             ),
+            200: OpenApiResponse(
+                response=CartItemSerializer,
+                description="Quantity of the cart item increased",
+            ),
             400: OpenApiResponse(description="Bad request"),
             401: OpenApiResponse(description="Unauthorized"),
             403: OpenApiResponse(description="Forbidden"),
@@ -171,7 +183,23 @@ from ..serializers import CartItemSerializer
         tags=["Cart Items"],
     ),
 )
-class CartItemViewSet(viewsets.ModelViewSet):
+class CartItemViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = CartItem.objects.all()
     serializer_class = CartItemSerializer
-    permission_classes = [IsNotItemAlreadyInCart]
+    permission_classes = [IsAuthenticated]
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        # Adding a listing that is already in the cart adds to its quantity
+        serializer = CartItemAddSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        cart_item, created = services.add_to_cart(
+            request.user,
+            serializer.validated_data["cart"],
+            serializer.validated_data["listing"],
+            serializer.validated_data["quantity"],
+        )
+        return Response(
+            CartItemSerializer(cart_item).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
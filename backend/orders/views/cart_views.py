@@ -4,11 +4,26 @@ from drf_spectacular.utils import (
     extend_schema,
     extend_schema_view,
 )
-from rest_framework import viewsets
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
+from core.idempotency import idempotent
+from core.views import ConditionalGetMixin
+
+from .. import services
+from ..coupons import resolve_coupon
 from ..models import Cart
 from ..permissions import IsNotAllowedToDestroy
-from ..serializers import CartSerializer
+from ..serializers import (
+    CartBatchSerializer,
+    CartSerializer,
+    CartSummarySerializer,
+    CouponApplySerializer,
+    TransactionSerializer,
+)
 
 
 @extend_schema_view(
@@ -180,7 +195,127 @@ from ..serializers import CartSerializer
         tags=["Carts"],
     ),
 )
-class CartViewSet(viewsets.ModelViewSet):
-    queryset = Cart.objects.all()
+class CartViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    queryset = Cart.objects.select_related("coupon")
     serializer_class = CartSerializer
     permission_classes = [IsNotAllowedToDestroy]
+
+    def get_own_cart(self):
+        cart = self.get_object()
+        if cart.buyer_id != self.request.user.id:
+            raise PermissionDenied("Cart does not belong to the user")
+        return cart
+
+    @extend_schema(
+        summary="Get a cart summary",
+        description=(
+            "Line items of the cart with their listing, and the subtotal, "
+            "discount and total of the cart, computed server-side."
+        ),
+        responses={
+            200: CartSummarySerializer,
+            401: OpenApiResponse(description="Unauthorized"),
+            403: OpenApiResponse(description="Forbidden"),
+            404: OpenApiResponse(description="Cart not found"),
+        },
+        tags=["Carts"],
+    )
+    @action(detail=True, methods=["get"], permission_classes=[IsAuthenticated])
+    def summary(self, request, pk=None):
+        summary = services.get_cart_summary(self.get_own_cart())
+        return Response(CartSummarySerializer(summary).data, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        summary="Change several cart items",
+        description=(
+            "Apply a list of `add`, `set` and `remove` operations to the items "
+            "of the cart at once. Either every operation is applied or none. "
+            "Returns the cart summary."
+        ),
+        request=CartBatchSerializer,
+        responses={
+            200: CartSummarySerializer,
+            400: OpenApiResponse(description="Invalid operations"),
+            401: OpenApiResponse(description="Unauthorized"),
+            403: OpenApiResponse(description="Forbidden"),
+            404: OpenApiResponse(description="Cart not found"),
+        },
+        tags=["Carts"],
+    )
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="items/batch",
+        permission_classes=[IsAuthenticated],
+    )
+    @idempotent
+    def batch(self, request, pk=None):
+        serializer = CartBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        cart = services.apply_cart_operations(
+            self.get_own_cart(), serializer.validated_data["operations"]
+        )
+
+        summary = services.get_cart_summary(cart)
+        return Response(CartSummarySerializer(summary).data, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        summary="Apply or remove a coupon",
+        description=(
+            "POST applies the coupon with the given code to the cart, DELETE "
+            "removes it. Both return the cart summary."
+        ),
+        request=CouponApplySerializer,
+        responses={
+            200: CartSummarySerializer,
+            400: OpenApiResponse(description="Invalid coupon code"),
+            401: OpenApiResponse(description="Unauthorized"),
+            403: OpenApiResponse(description="Forbidden"),
+            404: OpenApiResponse(description="Cart not found"),
+        },
+        tags=["Carts"],
+    )
+    @action(
+        detail=True, methods=["post", "delete"], permission_classes=[IsAuthenticated]
+    )
+    def coupon(self, request, pk=None):
+        cart = self.get_own_cart()
+        if request.method == "DELETE":
+            cart.coupon = None
+        else:
+            serializer = CouponApplySerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            cart.coupon = resolve_coupon(serializer.validated_data["code"])
+            if cart.coupon is None:
+                raise ValidationError({"code": "Invalid coupon code"})
+        cart.save(update_fields=["coupon", "modified"])
+
+        summary = services.get_cart_summary(cart)
+        return Response(CartSummarySerializer(summary).data, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        summary="Check out a cart",
+        description=(
+            "Buy every item of the cart: stock is taken off the listings, one "
+            "transaction is created per listing and the cart is emptied. "
+            "Send an `Idempotency-Key` header to make retries safe."
+        ),
+        request=None,
+        responses={
+            201: OpenApiResponse(
+                response=TransactionSerializer(many=True),
+                description="Transactions created",
+            ),
+            400: OpenApiResponse(description="Empty cart or unavailable listings"),
+            401: OpenApiResponse(description="Unauthorized"),
+            403: OpenApiResponse(description="Forbidden"),
+            404: OpenApiResponse(description="Cart not found"),
+        },
+        tags=["Carts"],
+    )
+    @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated])
+    @idempotent
+    def checkout(self, request, pk=None):
+        transactions = services.checkout(self.get_own_cart())
+        serializer = TransactionSerializer(transactions, many=True)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
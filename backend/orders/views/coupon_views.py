@@ -6,6 +6,8 @@ from drf_spectacular.utils import (
 )
 from rest_framework import viewsets
 
+from core.views import ConditionalGetMixin
+
 from ..models import Coupon
 from ..serializers import CouponSerializer
 
@@ -170,6 +172,6 @@ from ..serializers import CouponSerializer
         tags=["Coupons"],
     ),
 )
-class CouponViewSet(viewsets.ModelViewSet):
+class CouponViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Coupon.objects.all()
     serializer_class = CouponSerializer
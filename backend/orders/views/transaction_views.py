@@ -1,19 +1,37 @@
+from django.db import transaction
+from django.db.models import Q
 from drf_spectacular.utils import (
     OpenApiExample,
     OpenApiResponse,
     extend_schema,
     extend_schema_view,
 )
-from rest_framework import viewsets
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from core.idempotency import idempotent
+from core.pagination import KeysetPagination
+from core.views import ConditionalGetMixin
 
 from ..models import Transaction
-from ..serializers import TransactionSerializer
+from ..rollups import get_sales_analytics
+from ..serializers import (
+    SalesAnalyticsQuerySerializer,
+    SalesAnalyticsSerializer,
+    TransactionHistorySerializer,
+    TransactionSerializer,
+)
 
 
 @extend_schema_view(
     list=extend_schema(
         summary="List all transactions",
-        description="Returns a list of all transactions in the system.",
+        description=(
+            "Returns the transactions the current user bought or sold in, "
+            "or every transaction for staff users."
+        ),
         responses={
             200: OpenApiResponse(
                 response=TransactionSerializer(many=True),
@@ -186,6 +204,88 @@ from ..serializers import TransactionSerializer
         tags=["Transactions"],
     ),
 )
-class TransactionViewSet(viewsets.ModelViewSet):
+class TransactionViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Transaction.objects.all()
     serializer_class = TransactionSerializer
+
+    def get_queryset(self):
+        # Users only see the transactions they bought or sold in
+        queryset = super().get_queryset()
+        user = self.request.user
+        if not user.is_authenticated:
+            return queryset.none()
+        if user.is_staff:
+            return queryset
+        return queryset.filter(Q(buyer_id=user.id) | Q(seller_id=user.id))
+
+    def get_history(self, queryset):
+        page = self.paginate_queryset(queryset.select_related("listing"))
+        serializer = TransactionHistorySerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @extend_schema(
+        summary="Purchase history of the current user",
+        description="Transactions the current user bought in, newest first.",
+        responses={200: TransactionHistorySerializer(many=True)},
+        tags=["Transactions"],
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[IsAuthenticated],
+        pagination_class=KeysetPagination,
+    )
+    def purchases(self, request):
+        return self.get_history(Transaction.objects.filter(buyer_id=request.user.id))
+
+    @extend_schema(
+        summary="Sales history of the current user",
+        description="Transactions the current user sold in, newest first.",
+        responses={200: TransactionHistorySerializer(many=True)},
+        tags=["Transactions"],
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[IsAuthenticated],
+        pagination_class=KeysetPagination,
+    )
+    def sales(self, request):
+        return self.get_history(Transaction.objects.filter(seller_id=request.user.id))
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    def perform_create(self, serializer):
+        # The transaction, its rollup and its outbox event commit together
+        with transaction.atomic():
+            serializer.save()
+
+    @extend_schema(
+        summary="Sales analytics of the current user",
+        description=(
+            "Units sold, revenue and orders of the current user as a seller "
+            "between two dates (inclusive, the last 30 days by default), in "
+            "total, per day and per listing."
+        ),
+        parameters=[SalesAnalyticsQuerySerializer],
+        responses={
+            200: SalesAnalyticsSerializer,
+            400: OpenApiResponse(description="Bad request"),
+            401: OpenApiResponse(description="Unauthorized"),
+        },
+        tags=["Transactions"],
+    )
+    @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated])
+    def analytics(self, request):
+        serializer = SalesAnalyticsQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        analytics = get_sales_analytics(
+            request.user,
+            serializer.validated_data["start"],
+            serializer.validated_data["end"],
+        )
+        return Response(
+            SalesAnalyticsSerializer(analytics).data, status=status.HTTP_200_OK
+        )
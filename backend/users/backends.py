@@ -0,0 +1,44 @@
+import asyncio
+
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password
+
+from .models import User
+from .passwords import get_executor, verify_password
+
+
+class EmailBackend(ModelBackend):
+    """
+    ``ModelBackend`` that can also authenticate from async views, see
+    ``users.passwords.aauthenticate``. Both paths find the user with
+    ``User.objects.get_by_natural_key``, so emails match in any case.
+    """
+
+    async def aauthenticate(self, request, email=None, password=None, **kwargs):
+        # The hash is verified on the login pool so the event loop keeps
+        # serving requests
+        if email is None:
+            email = kwargs.get(User.USERNAME_FIELD)
+        if email is None or password is None:
+            return None
+
+        loop = asyncio.get_running_loop()
+        try:
+            user = await User.objects.aget_by_natural_key(email)
+        except User.DoesNotExist:
+            # Hash anyway so unknown emails take as long as wrong passwords
+            await loop.run_in_executor(get_executor(), make_password, password)
+            return None
+
+        valid, upgrade = await loop.run_in_executor(
+            get_executor(), verify_password, password, user.password
+        )
+        if not valid or not self.user_can_authenticate(user):
+            return None
+
+        if upgrade:
+            user.password = await loop.run_in_executor(
+                get_executor(), make_password, password
+            )
+            await user.asave(update_fields=["password"])
+        return user
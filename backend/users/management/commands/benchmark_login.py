@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient
+from django.urls import reverse
+
+
+class HostClient(AsyncClient):
+    # AsyncClient always sends "Host: testserver", this one sends ``host``
+    def __init__(self, host, **defaults):
+        super().__init__(**defaults)
+        self.host = host.encode()
+
+    def _base_scope(self, **request):
+        scope = super()._base_scope(**request)
+        scope["headers"] = [
+            (name, self.host if name == b"host" else value)
+            for name, value in scope["headers"]
+        ]
+        return scope
+
+
+class Command(BaseCommand):
+    help = "Measure login throughput of the async login view in process"
+
+    def add_arguments(self, parser):
+        parser.add_argument("email", help="Email of an existing user")
+        parser.add_argument("password", help="Password of that user")
+        parser.add_argument(
+            "--requests", type=int, default=100, help="Number of logins to run"
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=20,
+            help="Number of logins in flight at once",
+        )
+        parser.add_argument(
+            "--host",
+            default="localhost",
+            help="Host the requests are addressed to, one of ALLOWED_HOSTS",
+        )
+
+    def handle(self, *args, **options):
+        elapsed, failed = asyncio.run(self.run(options))
+        if failed == options["requests"]:
+            raise CommandError("Every login failed, check the credentials")
+
+        rate = options["requests"] / elapsed
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{options['requests']} logins in {elapsed:.2f}s, {failed} failed: "
+                f"{rate:.1f} logins/s, {rate / settings.LOGIN_HASH_WORKERS:.1f} "
+                f"per hashing thread"
+            )
+        )
+
+    async def run(self, options):
+        client = HostClient(options["host"])
+        url = reverse("async-login")
+        data = {"email": options["email"], "password": options["password"]}
+        semaphore = asyncio.Semaphore(options["concurrency"])
+
+        async def login():
+            async with semaphore:
+                response = await client.post(url, data, "application/json")
+                return response.status_code != 200
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(login() for _ in range(options["requests"])))
+        return time.perf_counter() - start, sum(results)
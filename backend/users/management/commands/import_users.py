@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.streams import FILE_FORMATS, get_file_format
+from users.provisioning import DEFAULT_BATCH_SIZE, UserProvisioner
+
+
+class Command(BaseCommand):
+    help = "Create users from a CSV or JSON lines file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSON lines file to import")
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=sorted(set(FILE_FORMATS.values())),
+            help="File format, guessed from the file extension by default",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of users inserted per batch",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Processes hashing passwords, the number of CPUs by default",
+        )
+
+    def handle(self, *args, **options):
+        file_format = options["file_format"] or get_file_format(options["path"])
+        if file_format is None:
+            raise CommandError("Cannot guess the file format, use --format")
+
+        provisioner = UserProvisioner(
+            batch_size=options["batch_size"], workers=options["workers"]
+        )
+        with open(options["path"], "rb") as stream:
+            report = provisioner.run(stream, file_format)
+
+        for error in report["errors"]:
+            for field, messages in error["errors"].items():
+                self.stderr.write(
+                    f"Line {error['line']}: {field}: {' '.join(messages)}"
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{report['created']} users imported, {report['failed']} rows "
+                f"failed, {report['conflicts']} of them existing emails"
+            )
+        )
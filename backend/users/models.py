@@ -32,8 +32,12 @@ class UserManager(BaseUserManager):
 
         return self.create_user(email, password, **extra_fields)
 
+    # Emails are stored lowercased, logins match them in any case
     def get_by_natural_key(self, email):
-        return self.get(email=email)
+        return self.get(email=email.lower())
+
+    async def aget_by_natural_key(self, email):
+        return await self.aget(email=email.lower())
 
 
 # Models
@@ -71,39 +75,26 @@ class User(AbstractBaseUser, BaseModel):
     def save(self, *args, **kwargs):
         self.email = self.email.lower()
 
-        # Ensure the user's settings are set
-        if not self.settings:
-            self.settings = Settings.objects.get_or_create(id=1)[0]
+        # Ensure the user's settings are set, users share the default row
+        # until they change it
+        default_settings = Settings.objects.get_default()
+        if self.settings_id is None:
+            self.settings = default_settings
+        elif (
+            self.settings_id == default_settings.id
+            and User.settings.is_cached(self)
+            and not Settings.objects.is_default(self.settings)
+        ):
+            self.settings = Settings.objects.create(
+                **{field: getattr(self.settings, field) for field in SETTINGS_FIELDS}
+            )
 
+        adding = self._state.adding
         instance = super(User, self).save(*args, **kwargs)
 
-        default_settings = Settings.objects.get(id=1)
-        fields = [
-            field
-            for field in Settings._meta.get_fields()
-            if field.concrete
-            and not field.many_to_many
-            and field is not Settings._meta.pk
-        ]
-
-        # Check if the user's settings differ from the default settings
-        fields_differ = any(
-            getattr(self.settings, field.name) != getattr(default_settings, field.name)
-            for field in fields
-        )
-
-        # If the settings differ, create a new settings object for the user
-        if fields_differ:
-            new_settings = Settings.objects.create(
-                **{field.name: getattr(self.settings, field.name) for field in fields}
-            )
-            self.settings = new_settings
-            super(User, self).save(*args, **kwargs)
-
-        # Create a cart for the user
-        if not hasattr(self, "cart"):
-            cart = Cart.objects.create(buyer=self)
-            self.cart = cart
+        # Create the cart of a new user
+        if adding:
+            Cart.objects.create(buyer=self)
 
         return instance
 
@@ -171,12 +162,54 @@ class Message(BaseModel):
         )
 
 
+DEFAULT_SETTINGS_ID = 1
+
+
+class SettingsManager(models.Manager):
+    # Values of the default row, cached per process and dropped by the
+    # Settings signals
+    _default_values = None
+
+    def get_default(self):
+        # A fresh instance of the default row, queried once per process
+        values = SettingsManager._default_values
+        if values is None:
+            default = self.get_or_create(id=DEFAULT_SETTINGS_ID)[0]
+            values = {
+                field.attname: getattr(default, field.attname)
+                for field in self.model._meta.concrete_fields
+            }
+            SettingsManager._default_values = values
+        return self.model.from_db(self.db, list(values), list(values.values()))
+
+    def is_default(self, settings):
+        default = self.get_default()
+        return all(
+            getattr(settings, field) == getattr(default, field)
+            for field in SETTINGS_FIELDS
+        )
+
+    @staticmethod
+    def clear_default_cache():
+        SettingsManager._default_values = None
+
+
 class Settings(BaseModel):
     dark_mode = models.BooleanField(default=False)
 
+    objects = SettingsManager()
+
     class Meta:
         verbose_name = "Settings"
         verbose_name_plural = "Settings"
 
     def __str__(self):
         return f"{self.dark_mode}"
+
+
+# Fields a user can change, what settings are compared against the default on
+SETTINGS_FIELDS = [
+    field.attname
+    for field in Settings._meta.concrete_fields
+    if not field.primary_key and field.name not in ("created", "modified")
+]
@@ -0,0 +1,70 @@
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import load_backend
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.signals import user_login_failed
+from django.core.exceptions import PermissionDenied
+
+_executor = None
+
+
+def get_executor():
+    # hashlib releases the GIL while hashing, so threads run hashes in
+    # parallel and the pool size bounds the CPU a login storm can take
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.LOGIN_HASH_WORKERS, thread_name_prefix="login"
+        )
+    return _executor
+
+
+def verify_password(password, encoded):
+    # Returns (valid, whether the hash must be upgraded)
+    upgrade = []
+    valid = check_password(password, encoded, setter=upgrade.append)
+    return valid, bool(upgrade)
+
+
+def _clean_credentials(credentials):
+    # What user_login_failed receivers get, without the password
+    return {
+        key: "********************" if key == "password" else value
+        for key, value in credentials.items()
+    }
+
+
+async def aauthenticate(request=None, **credentials):
+    """
+    Async ``django.contrib.auth.authenticate``: the first user one of the
+    ``AUTHENTICATION_BACKENDS`` accepts the credentials of, or None after
+    sending ``user_login_failed``. Backends with an ``aauthenticate`` method
+    are awaited, e.g. ``EmailBackend`` verifying on the login pool, the
+    others run on a thread.
+    """
+    for backend_path in settings.AUTHENTICATION_BACKENDS:
+        backend = load_backend(backend_path)
+        try:
+            inspect.signature(backend.authenticate).bind(request, **credentials)
+        except TypeError:
+            # The backend takes other credentials
+            continue
+
+        try:
+            if hasattr(backend, "aauthenticate"):
+                user = await backend.aauthenticate(request, **credentials)
+            else:
+                user = await sync_to_async(backend.authenticate)(request, **credentials)
+        except PermissionDenied:
+            break
+        if user is not None:
+            user.backend = backend_path
+            return user
+
+    await user_login_failed.asend(
+        sender=__name__, credentials=_clean_credentials(credentials), request=request
+    )
+    return None
@@ -16,15 +16,15 @@ class IsAllowedToReview(permissions.BasePermission):
             listing_id = request.data.get("listing")
             if listing_id:
                 listing = Listing.objects.get(pk=listing_id)
-                return listing.owner != request.user
+                return listing.owner_id != request.user.id
         return True
 
     def has_object_permission(self, request, view, obj):
         if view.action in ["update", "partial_update", "destroy"]:
-            return obj.listing.owner != request.user
+            return obj.listing.owner_id != request.user.id
         return True
 
 
 class IsAllowedToDestroyReview(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        return obj.user == request.user
+        return obj.user_id == request.user.id
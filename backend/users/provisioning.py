@@ -0,0 +1,136 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from core.streams import DEFAULT_BATCH_SIZE, RecordImporter
+from orders.models import Cart
+
+from .models import Settings, User
+
+# Validated without the unique check of RegisterSerializer, existing emails
+# are looked up once per batch instead
+USER_FIELDS = {
+    "email": serializers.EmailField(max_length=254),
+    "password": serializers.CharField(),
+    "first_name": serializers.CharField(
+        max_length=255, required=False, allow_blank=True
+    ),
+    "last_name": serializers.CharField(
+        max_length=255, required=False, allow_blank=True
+    ),
+}
+
+
+def _setup_worker():
+    # Spawned workers need the settings for the password hashers
+    django.setup()
+
+
+class UserProvisioner(RecordImporter):
+    """
+    Create users from a CSV or JSON lines stream with ``email``,
+    ``password``, ``first_name`` and ``last_name`` columns.
+
+    Passwords are hashed across a pool of ``workers`` processes, as hashing
+    is what bounds the throughput. Users and their carts are then inserted
+    with one ``bulk_create`` each per batch, sharing the default
+    ``Settings`` row. Rows whose email is taken, in the database or earlier
+    in the file, are reported as conflicts and skipped.
+    """
+
+    fields = USER_FIELDS
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, workers=None):
+        super().__init__(batch_size)
+        self.workers = os.cpu_count() if workers is None else workers
+        self.pool = None
+        self.emails = set()
+        self.conflicts = 0
+
+    def validate_row(self, record):
+        attrs = super().validate_row(record)
+        attrs["email"] = attrs["email"].lower()
+        return attrs
+
+    def accept(self, line_number, attrs):
+        if attrs["email"] in self.emails:
+            self.add_conflict(line_number)
+            return False
+        self.emails.add(attrs["email"])
+        return True
+
+    def add_conflict(self, line_number):
+        self.conflicts += 1
+        self.add_error(line_number, {"email": ["User with this email already exists."]})
+
+    def hash_passwords(self, passwords):
+        if self.pool is None:
+            return [make_password(password) for password in passwords]
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return list(self.pool.map(make_password, passwords, chunksize=chunksize))
+
+    def insert(self, rows, settings_id):
+        # Returns the created users and the lines of the emails already taken
+        existing = set(
+            User.objects.filter(
+                email__in=[attrs["email"] for _, attrs in rows]
+            ).values_list("email", flat=True)
+        )
+        new_users = [
+            User(settings_id=settings_id, **attrs)
+            for _, attrs in rows
+            if attrs["email"] not in existing
+        ]
+        taken = [line for line, attrs in rows if attrs["email"] in existing]
+        if not new_users:
+            return [], taken
+
+        with transaction.atomic():
+            users = User.objects.bulk_create(new_users)
+            Cart.objects.bulk_create([Cart(buyer=user) for user in users])
+        return users, taken
+
+    def insert_each(self, rows, settings_id):
+        # One row at a time, a row losing a race for its email is a conflict
+        users = []
+        taken = []
+        for row in rows:
+            try:
+                created, conflicts = self.insert([row], settings_id)
+            except IntegrityError:
+                created, conflicts = [], [row[0]]
+            users += created
+            taken += conflicts
+        return users, taken
+
+    def flush(self, rows):
+        passwords = self.hash_passwords([attrs.pop("password") for _, attrs in rows])
+        for (_, attrs), password in zip(rows, passwords):
+            attrs["password"] = password
+
+        settings_id = Settings.objects.get_default().id
+        try:
+            users, taken = self.insert(rows, settings_id)
+        except IntegrityError:
+            # An email was registered since it was checked
+            users, taken = self.insert_each(rows, settings_id)
+        self.created += len(users)
+        for line_number in taken:
+            self.add_conflict(line_number)
+
+    def run(self, stream, file_format):
+        if self.workers > 1:
+            self.pool = ProcessPoolExecutor(self.workers, initializer=_setup_worker)
+        try:
+            return super().run(stream, file_format)
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown()
+                self.pool = None
+
+    def get_report(self):
+        return {**super().get_report(), "conflicts": self.conflicts}
@@ -1,14 +1,18 @@
 from django.contrib.auth import authenticate
 from rest_framework import serializers
 
+from core.streams import FILE_FORMATS, get_file_format
+
 from .models import Address, Favorite, Message, Review, User
 
 
 # Serializers define the API representation
-class LoginSerializer(serializers.Serializer):
+class LoginCredentialsSerializer(serializers.Serializer):
     email = serializers.EmailField()
     password = serializers.CharField()
 
+
+class LoginSerializer(LoginCredentialsSerializer):
     def validate(self, data):
         email = data.get("email")
         password = data.get("password")
@@ -28,14 +32,6 @@ class LoginSerializer(serializers.Serializer):
         data["user"] = user
         return data
 
-    def create(self, validated_data):
-        email = validated_data.pop("email")
-        password = validated_data.pop("password")
-        user = authenticate(email=email, password=password)
-        if user is None:
-            raise serializers.ValidationError("Invalid login credentials")
-        return user
-
 
 def validate_email(value):
     if User.objects.filter(email=value).exists():
@@ -83,6 +79,25 @@ class UserSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class UserImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    file_format = serializers.ChoiceField(
+        choices=sorted(set(FILE_FORMATS.values())), required=False
+    )
+    batch_size = serializers.IntegerField(
+        min_value=1, max_value=5000, required=False, default=500
+    )
+
+    def validate(self, attrs):
+        if "file_format" not in attrs:
+            attrs["file_format"] = get_file_format(attrs["file"].name)
+            if attrs["file_format"] is None:
+                raise serializers.ValidationError(
+                    {"file_format": "Cannot guess the file format"}
+                )
+        return attrs
+
+
 class AddressSerializer(serializers.ModelSerializer):
     class Meta:
         model = Address
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.authentication import forget_user
+
+from .models import DEFAULT_SETTINGS_ID, Settings, User
+
+
+@receiver(post_save, sender=Settings)
+@receiver(post_delete, sender=Settings)
+def clear_default_settings_cache(sender, instance, **kwargs):
+    if instance.pk == DEFAULT_SETTINGS_ID:
+        Settings.objects.clear_default_cache()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
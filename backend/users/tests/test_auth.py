@@ -1,5 +1,13 @@
 # noqa: F401
+from io import StringIO
+from unittest.mock import patch
+
 import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.signals import user_login_failed
+from django.core.management import call_command
+from django.test import AsyncClient
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -112,6 +120,26 @@ class TestUserModel:
         assert Settings.objects.get(id=2).dark_mode is True
         assert user_fixture.settings.dark_mode is True
 
+    @pytest.mark.django_db
+    def test_save_user_with_default_settings_is_one_query(
+        self, user_fixture, django_assert_num_queries
+    ):
+        with django_assert_num_queries(1):
+            user_fixture.first_name = "Jack"
+            user_fixture.save()
+
+        # Reloaded users keep their one cart and do not read their settings
+        user = User.objects.get(id=user_fixture.id)
+        with django_assert_num_queries(1):
+            user.save()
+        assert Cart.objects.filter(buyer=user).count() == 1
+
+        # Writes to the default row are picked up
+        Settings.objects.filter(id=1).get().save()
+        user_fixture.settings.dark_mode = True
+        user_fixture.save()
+        assert user_fixture.settings.id == 2
+
     @pytest.mark.django_db
     def test_if_settings_instance_is_not_deleted_when_user_is_deleted(
         self, user_fixture
@@ -173,6 +201,80 @@ class TestUserViews:
         response = client.post(login_url, data=data)
         assert response.status_code == status.HTTP_400_BAD_REQUEST
 
+    @pytest.mark.django_db
+    def test_user_can_login_with_one_password_check(self, user_fixture):
+        client = APIClient()
+        data = {"email": user_fixture.email, "password": "password123"}
+        with patch(
+            "django.contrib.auth.base_user.check_password", wraps=check_password
+        ) as checks:
+            response = client.post(reverse("login"), data=data)
+        assert response.status_code == status.HTTP_200_OK
+        assert checks.call_count == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_user_can_login_async(self, user_fixture):
+        client = AsyncClient()
+        login_url = reverse("async-login")
+
+        response = async_to_sync(client.post)(login_url)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        data = {"email": "Test@Example.com", "password": "password123"}
+        response = async_to_sync(client.post)(login_url, data, "application/json")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["access_token"]
+        assert response.cookies["refresh_token"]["httponly"]
+
+        data["password"] = "wrong-password"
+        response = async_to_sync(client.post)(login_url, data, "application/json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.django_db(transaction=True)
+    def test_sync_and_async_logins_agree(self, user_fixture):
+        failures = []
+
+        def record_failure(sender, credentials, **kwargs):
+            failures.append(credentials)
+
+        user_login_failed.connect(record_failure)
+        try:
+            for password, expected in [
+                ("password123", status.HTTP_200_OK),
+                ("wrong-password", status.HTTP_400_BAD_REQUEST),
+            ]:
+                data = {"email": "Test@Example.com", "password": password}
+                response = APIClient().post(reverse("login"), data)
+                assert response.status_code == expected
+                response = async_to_sync(AsyncClient().post)(
+                    reverse("async-login"), data, "application/json"
+                )
+                assert response.status_code == expected
+        finally:
+            user_login_failed.disconnect(record_failure)
+
+        # Both report the failed attempts, without the password
+        assert [credentials["email"] for credentials in failures] == [
+            "Test@Example.com"
+        ] * 2
+        assert all(
+            credentials["password"] != "wrong-password" for credentials in failures
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_benchmark_login(self, user_fixture):
+        stdout = StringIO()
+        call_command(
+            "benchmark_login",
+            user_fixture.email,
+            "password123",
+            "--requests",
+            "4",
+            stdout=stdout,
+        )
+        assert "4 logins in" in stdout.getvalue()
+        assert "0 failed" in stdout.getvalue()
+
     @pytest.mark.django_db
     def test_user_can_logout(self, user_fixture):
         client = APIClient()
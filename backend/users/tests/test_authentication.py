@@ -0,0 +1,61 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from conftest import User
+from core.authentication import ClaimsUser
+
+
+def get_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    return client
+
+
+class TestClaimsAuthentication:
+    @pytest.mark.django_db
+    def test_requests_do_not_load_the_user(self, user_fixture):
+        client = get_client(user_fixture)
+        purchases_url = reverse("transaction-purchases")
+
+        with CaptureQueriesContext(connection) as first:
+            assert client.get(purchases_url).status_code == 200
+        with CaptureQueriesContext(connection) as second:
+            assert client.get(purchases_url).status_code == 200
+
+        # Only the first request reads the flags of the user
+        assert len(second) == len(first) - 1
+        assert not any("users_user" in query["sql"] for query in second)
+
+    @pytest.mark.django_db
+    def test_user_changes_are_picked_up(self):
+        user = User.objects.create_user(email="staff@example.com", password="pw")
+        client = get_client(user)
+        import_url = reverse("user-import-users")
+        assert client.post(import_url).status_code == 403
+
+        user.is_staff = True
+        user.save()
+        assert client.post(import_url).status_code == 400
+
+        user.delete()
+        assert client.post(import_url).status_code == 401
+
+    @pytest.mark.django_db
+    def test_claims_user_loads_the_user_lazily(
+        self, user_fixture, django_assert_num_queries
+    ):
+        user = ClaimsUser(user_fixture.id, {"is_staff": False, "is_superuser": False})
+
+        with django_assert_num_queries(0):
+            assert user
+            assert user.pk == user_fixture.id
+            assert user.is_authenticated and not user.is_staff
+
+        with django_assert_num_queries(1):
+            assert user.email == "test@example.com"
+            assert user == user_fixture
+            assert isinstance(user, User)
@@ -0,0 +1,107 @@
+import io
+import json
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from conftest import User, csv_file, get_error_lines
+from orders.models import Cart
+from users.models import Settings
+from users.provisioning import UserProvisioner
+
+CSV_ROWS = csv_file(
+    "email,password,first_name,last_name",
+    "Ann@Example.com,secret1,Ann,Lee",
+    "test@example.com,secret2,Taken,Email",
+    "not an email,secret3,,",
+    "ann@example.com,secret4,Ann,Again",
+    "bob@example.com,secret5,,",
+)
+
+
+class TestUserProvisioning:
+    @pytest.mark.django_db
+    def test_provision_users(self, user_fixture):
+        provisioner = UserProvisioner(batch_size=2, workers=1)
+        report = provisioner.run(io.BytesIO(CSV_ROWS), "csv")
+
+        assert report["created"] == 2
+        assert report["failed"] == 3
+        assert report["conflicts"] == 2
+        assert get_error_lines(report) == [
+            (3, ["email"]),
+            (4, ["email"]),
+            (5, ["email"]),
+        ]
+
+        ann = User.objects.get(email="ann@example.com")
+        assert ann.check_password("secret1")
+        assert ann.last_name == "Lee"
+        assert ann.cart.buyer == ann
+        assert ann.settings_id == user_fixture.settings_id
+        assert Settings.objects.count() == 1
+        assert Cart.objects.count() == 3
+
+    @pytest.mark.django_db
+    def test_provision_users_racing_a_registration(self, monkeypatch):
+        insert = UserProvisioner.insert
+
+        def racing_insert(provisioner, rows, settings_id):
+            if len(rows) > 1:
+                # bob registers between the email check and the insert
+                User.objects.create_user("bob@example.com", "other")
+                raise IntegrityError
+            return insert(provisioner, rows, settings_id)
+
+        monkeypatch.setattr(UserProvisioner, "insert", racing_insert)
+        report = UserProvisioner(workers=1).run(io.BytesIO(CSV_ROWS), "csv")
+
+        # The batch is inserted row by row, bob is reported as a conflict
+        assert report["created"] == 2
+        assert report["conflicts"] == 2
+        assert (6, ["email"]) in get_error_lines(report)
+        assert User.objects.get(email="bob@example.com").check_password("other")
+
+    @pytest.mark.django_db
+    def test_import_users_command_hashes_in_processes(self, tmp_path):
+        path = tmp_path / "users.jsonl"
+        path.write_text(
+            "\n".join(
+                json.dumps({"email": f"user{i}@example.com", "password": f"pw{i}"})
+                for i in range(4)
+            )
+        )
+
+        stdout = io.StringIO()
+        call_command("import_users", str(path), "--workers", "2", stdout=stdout)
+        assert "4 users imported, 0 rows failed" in stdout.getvalue()
+        assert User.objects.get(email="user3@example.com").check_password("pw3")
+
+    @pytest.mark.django_db
+    def test_import_users_endpoint(self, user_fixture, superuser_fixture):
+        client = APIClient()
+        import_url = reverse("user-import-users")
+        upload = SimpleUploadedFile("users.csv", CSV_ROWS)
+
+        client.force_authenticate(user_fixture)
+        assert client.post(import_url, {"file": upload}).status_code == 403
+
+        client.force_authenticate(superuser_fixture)
+        upload.seek(0)
+        response = client.post(import_url, {"file": upload})
+        assert response.status_code == 200
+        assert response.data["created"] == 2
+        assert response.data["conflicts"] == 2
+
+        # Rows before bytes that are not UTF-8 are kept and reported
+        upload = SimpleUploadedFile(
+            "users.csv", b"email,password\nc@example.com,pw\n\xff"
+        )
+        response = client.post(import_url, {"file": upload})
+        assert response.status_code == 200
+        assert response.data["created"] == 1
+        assert get_error_lines(response.data) == [(3, ["non_field_errors"])]
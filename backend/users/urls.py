@@ -11,6 +11,7 @@ router.register(r"reviews", review_views.ReviewViewSet, basename="review")
 urlpatterns = [
     path("", include(router.urls)),
     path("login/", auth_views.LoginView.as_view(), name="login"),
+    path("login/async/", auth_views.AsyncLoginView.as_view(), name="async-login"),
     path("register/", auth_views.RegisterView.as_view(), name="register"),
     path("logout/", auth_views.LogoutView.as_view(), name="logout"),
 ]
@@ -7,6 +7,8 @@ from drf_spectacular.utils import (
 )
 from rest_framework import permissions, viewsets
 
+from core.views import ConditionalGetMixin
+
 from ..models import Address
 from ..permissions import IsOwnerOrReadOnly
 from ..serializers import AddressSerializer
@@ -271,7 +273,7 @@ from ..serializers import AddressSerializer
         tags=["Addresses"],
     ),
 )
-class AddressViewSet(viewsets.ModelViewSet):
+class AddressViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Address.objects.all()
     serializer_class = AddressSerializer
     permission_classes = [
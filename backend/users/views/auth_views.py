@@ -1,7 +1,12 @@
+import json
 import logging
 from datetime import datetime
 
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
 from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.debug import sensitive_post_parameters
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiExample, OpenApiResponse, extend_schema
@@ -17,11 +22,36 @@ from rest_framework_simplejwt.views import TokenRefreshView
 from core.common import responseMessages
 from core.common.globalFunctions import get_refresh_token
 
-from ..serializers import LoginSerializer, RegisterSerializer
+from ..passwords import aauthenticate
+from ..serializers import (
+    LoginCredentialsSerializer,
+    LoginSerializer,
+    RegisterSerializer,
+)
 
 logger = logging.getLogger("django")
 
-__all__ = ["LoginView", "RegisterView", "RefreshTokenView"]
+__all__ = ["AsyncLoginView", "LoginView", "RegisterView", "RefreshTokenView"]
+
+LOGIN_ERROR = "An internal error has occurred. Please try again later."
+
+
+def get_login_response_data(refresh):
+    return {
+        "message": responseMessages.LOGIN_MESSAGE,
+        "response": responseMessages.SUCCESS_RESPONSE_MESSAGE,
+        "access_token": str(refresh.access_token),
+    }
+
+
+def set_refresh_cookie(response, refresh):
+    response.set_cookie(
+        "refresh_token",
+        str(refresh),
+        httponly=True,
+        secure=True,
+        samesite="Lax",
+    )
 
 
 @method_decorator(sensitive_post_parameters("password"), name="dispatch")
@@ -85,32 +115,57 @@ class LoginView(APIView):
                 data=request.data, context={"request": request}
             )
             serializer.is_valid(raise_exception=True)
-            serializer.save()
             user = serializer.validated_data.get("user")
             refresh = RefreshToken.for_user(user)
 
-            response_data = {
-                "message": responseMessages.LOGIN_MESSAGE,
-                "response": responseMessages.SUCCESS_RESPONSE_MESSAGE,
-                "access_token": str(refresh.access_token),
-            }
-            response = Response(response_data, status=status.HTTP_200_OK)
-            response.set_cookie(
-                "refresh_token",
-                str(refresh),
-                httponly=True,
-                secure=True,
-                samesite="Lax",
+            response = Response(
+                get_login_response_data(refresh), status=status.HTTP_200_OK
             )
+            set_refresh_cookie(response, refresh)
             return response
 
         except APIException as exe:
             logger.error(str(exe), exc_info=True)
-            return Response(
-                {"detail": "An internal error has occurred. Please try again later."},
-                status=status.HTTP_400_BAD_REQUEST,
+            return Response({"detail": LOGIN_ERROR}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+@method_decorator(sensitive_post_parameters("password"), name="dispatch")
+class AsyncLoginView(View):
+    """
+    Same contract as ``LoginView`` for ASGI deployments. The password hash
+    is checked on a pool of ``LOGIN_HASH_WORKERS`` threads, so a burst of
+    logins does not block the event loop serving other requests.
+    """
+
+    http_method_names = ["post"]
+
+    async def post(self, request):
+        if request.content_type == "application/json":
+            try:
+                data = json.loads(request.body or b"{}")
+            except ValueError:
+                data = None
+        else:
+            data = request.POST
+
+        serializer = LoginCredentialsSerializer(data=data)
+        user = None
+        if serializer.is_valid():
+            user = await aauthenticate(request, **serializer.validated_data)
+        if user is None:
+            return JsonResponse(
+                {"detail": LOGIN_ERROR}, status=status.HTTP_400_BAD_REQUEST
             )
 
+        # Recording the outstanding refresh token is a database write
+        refresh = await sync_to_async(RefreshToken.for_user)(user)
+        response = JsonResponse(
+            get_login_response_data(refresh), status=status.HTTP_200_OK
+        )
+        set_refresh_cookie(response, refresh)
+        return response
+
 
 @method_decorator(
     sensitive_post_parameters("password", "confirm_password"), name="dispatch"
@@ -8,6 +8,8 @@ from drf_spectacular.utils import (
 )
 from rest_framework import permissions, viewsets
 
+from core.views import ConditionalGetMixin
+
 from ..models import Review
 from ..permissions import IsAllowedToDestroyReview, IsAllowedToReview
 from ..serializers import ReviewSerializer
@@ -205,7 +207,7 @@ from ..serializers import ReviewSerializer
         tags=["Reviews"],
     ),
 )
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     permission_classes = [
@@ -1,8 +1,16 @@
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
-from rest_framework import viewsets
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from core.views import ConditionalGetMixin
 
 from ..models import User
-from ..serializers import UserSerializer
+from ..provisioning import UserProvisioner
+from ..serializers import UserImportSerializer, UserSerializer
 
 
 @extend_schema_view(
@@ -27,6 +35,35 @@ from ..serializers import UserSerializer
         tags=["Users"],
     ),
 )
-class UserViewSet(viewsets.ReadOnlyModelViewSet):
+class UserViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
+
+    @extend_schema(
+        summary="Import users",
+        description=(
+            "Bulk create users from a CSV or JSON lines file with email, "
+            "password, first_name and last_name columns. Invalid rows and "
+            "emails that are already taken are reported with their line "
+            "number and skipped."
+        ),
+        request={"multipart/form-data": UserImportSerializer},
+        responses={200: OpenApiTypes.OBJECT},
+        tags=["Users"],
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        permission_classes=[IsAdminUser],
+        parser_classes=[MultiPartParser],
+    )
+    def import_users(self, request):
+        serializer = UserImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        # Requests hash in their own thread, the pool is for the command
+        provisioner = UserProvisioner(batch_size=data["batch_size"], workers=1)
+        report = provisioner.run(data["file"], data["file_format"])
+        return Response(report, status=status.HTTP_200_OK)